@@ -1,9 +1,9 @@
+import io
 import os
 import shutil
 import zipfile
 import uuid
 import json
-import re
 import threading
 from pathlib import Path
 from datetime import datetime
@@ -11,14 +11,37 @@ from flask import (
     Flask, render_template, request, redirect, url_for,
     flash, send_file, jsonify
 )
-from deep_translator import GoogleTranslator
+from deep_translator.exceptions import TooManyRequests
 from gtts import gTTS
 import speech_recognition as sr
-from pydub import AudioSegment
+from pydub.utils import mediainfo
 import tempfile
 from threading import Lock
 import xml.etree.ElementTree as ET
 import time
+import requests
+
+from audio_prep import AudioChunk, load_chunks, wav_buffer
+from course_inventory import (
+    build_inventory, entries, file_hash, find_by_name, load_inventory, save_inventory,
+    unchanged_paths
+)
+from glossary import (
+    Glossary, config_error, load_config, placeholders_intact, translate_with_glossary,
+)
+from language_detect import SAMPLE_SIZE, detect_language, qualifies
+from rate_limiter import ProviderLimiter
+from segment_filter import filter_segments
+from segments import apply_files, extract_file, extract_files
+from transcript_cache import TranscriptCache
+from translation_backends import (
+    BackendChain, GoogleBackend, HttpStubBackend, MyMemoryBackend
+)
+from translation_batch import pack_batches
+from translation_engine import Stage, Throughput, run_bounded, run_pipeline
+from translation_memory import TranslationMemory
+from translator_pool import ServerError, TranslatorPool
+from vendor_index import VendorIndex
 
 # ── Translation progress tracking ───────────────────────────
 progress = {}
@@ -47,10 +70,13 @@ SCORM_SRC = BASE / "static" / "scorm"
 SCORM_TRANSLATED = BASE / "static" / "scorm_translated"
 ZIPS = BASE / "zips"
 METADATA = BASE / "metadata.json"
-TEMP_AUDIO = BASE / "temp_audio"
+CACHE_DIR = BASE / "cache"
+INVENTORIES = BASE / "inventories"
+GLOSSARIES = BASE / "glossaries"
+GLOBAL_GLOSSARY = GLOSSARIES / "global.json"
 
 # Ensure directories exist
-for p in (UPLOADS, SCORM_SRC, SCORM_TRANSLATED, ZIPS, TEMP_AUDIO):
+for p in (UPLOADS, SCORM_SRC, SCORM_TRANSLATED, ZIPS, CACHE_DIR, INVENTORIES, GLOSSARIES):
     p.mkdir(parents=True, exist_ok=True)
 
 
@@ -60,6 +86,58 @@ def get_progress_route(pkg_id):
     return jsonify(get_progress(pkg_id))
 
 
+@app.route("/translation-memory/stats")
+def translation_memory_stats():
+    """Return translation memory size and hit/miss counters"""
+    return jsonify(translation_memory.stats())
+
+
+@app.route("/transcript-cache/stats")
+def transcript_cache_stats():
+    """Return transcript cache size and hit/miss counters"""
+    return jsonify(transcript_cache.stats())
+
+
+@app.route("/translation-provider/stats")
+def translation_provider_stats():
+    """Return circuit breaker state and pacing for each translation backend"""
+    return jsonify(translation_chain.stats())
+
+
+@app.route("/estimate/<pkg_id>")
+def estimate(pkg_id):
+    """Dry-run cost estimate; ?lang=fr (code or name) adds the cache hit rate"""
+    if not (SCORM_SRC / pkg_id).exists():
+        return jsonify({"error": "Course not found"}), 404
+    lang = request.args.get("lang")
+    include_audio = request.args.get("audio", "1") != "0"
+    return jsonify(estimate_translation(pkg_id, LANGS.get(lang, lang), include_audio))
+
+
+@app.route("/glossary/<pkg_id>", methods=["GET", "POST"])
+def course_glossary(pkg_id):
+    """Read or replace a course's glossary ({"do_not_translate": [...], "terms": {lang: {...}}})"""
+    if not (SCORM_SRC / pkg_id).exists():
+        return jsonify({"error": "Course not found"}), 404
+    path = course_glossary_path(pkg_id)
+    if request.method == "GET":
+        return jsonify(load_config(path))
+
+    config = request.get_json(force=True, silent=True)
+    error = config_error(config)
+    if error:
+        return jsonify({"error": error}), 400
+    with open(path, "w") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+    return jsonify(config)
+
+
+@app.route("/vendor-index/stats")
+def vendor_index_stats():
+    """Return how many vendor/runtime file hashes are configured and learned"""
+    return jsonify(vendor_index.stats())
+
+
 # ── Translation utils ──────────────────────────────────────
 LANGS = {
     "English": "en", "French": "fr", "German": "de",
@@ -75,35 +153,139 @@ GTTS_LANGS = {
     "it": "it", "pt": "pt", "ko": "ko", "ar": "ar"
 }
 
+# Maximum translator requests in flight per job
+TRANSLATION_WORKERS = int(os.environ.get("TRANSLATION_WORKERS", "8"))
+
+# Persistent translation memory, checked before any network call
+TRANSLATION_MEMORY_MAX_ENTRIES = 200_000
+translation_memory = TranslationMemory(
+    CACHE_DIR / "translation_memory.sqlite3",
+    max_entries=TRANSLATION_MEMORY_MAX_ENTRIES,
+)
+
+# Speech recognition results keyed by audio content hash, checked before any
+# ASR call and shared by every language and course
+TRANSCRIPT_CACHE_MAX_ENTRIES = 50_000
+transcript_cache = TranscriptCache(
+    CACHE_DIR / "transcript_cache.sqlite3",
+    max_entries=TRANSCRIPT_CACHE_MAX_ENTRIES,
+)
+
+
+def is_throttle_error(exc):
+    """True when the provider is pushing back (429, 5xx) rather than rejecting the text"""
+    # Other 4xx responses (400 bad request, 413 too large) are about the
+    # request itself; backing off would not help
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, (
+        TooManyRequests, ServerError,
+        requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+    ))
+
+
+# Shared by every job in the process so concurrent courses don't burst past
+# what the provider will sustain
+google_limiter = ProviderLimiter(
+    "GoogleTranslator",
+    rate=float(os.environ.get("TRANSLATION_RATE", "5")),
+    is_throttle=is_throttle_error,
+    initial=4,
+    maximum=max(TRANSLATION_WORKERS, 4) * 2,
+)
+mymemory_limiter = ProviderLimiter(
+    "MyMemoryTranslator", rate=2, is_throttle=is_throttle_error, initial=2, maximum=4,
+)
+# The stub's injected 429/503s go through the same back-off as real providers
+stub_limiter = ProviderLimiter(
+    "TranslationStub",
+    rate=float(os.environ.get("TRANSLATION_STUB_RATE", "50")),
+    is_throttle=is_throttle_error,
+    initial=4,
+    maximum=max(TRANSLATION_WORKERS, 4) * 2,
+)
+
+
+# Long-lived translator clients sharing one keep-alive connection pool
+translator_pool = TranslatorPool(pool_size=max(TRANSLATION_WORKERS, 4) * 2)
+
+# Ordered fallback chain, e.g. TRANSLATION_BACKENDS="stub" with
+# translation_stub_server.py running for offline load tests
+TRANSLATION_BACKENDS = os.environ.get("TRANSLATION_BACKENDS", "google,mymemory")
+TRANSLATION_STUB_URL = os.environ.get("TRANSLATION_STUB_URL", "http://127.0.0.1:5055/translate")
+
+BACKEND_FACTORIES = {
+    "google": lambda: GoogleBackend(
+        translator_pool, google_limiter, max_workers=TRANSLATION_WORKERS
+    ),
+    "mymemory": lambda: MyMemoryBackend(mymemory_limiter, max_workers=2),
+    "stub": lambda: HttpStubBackend(
+        TRANSLATION_STUB_URL, translator_pool.session, stub_limiter,
+        max_workers=TRANSLATION_WORKERS,
+    ),
+}
+
+translation_chain = BackendChain([
+    BACKEND_FACTORIES[name.strip()]()
+    for name in TRANSLATION_BACKENDS.split(",") if name.strip()
+])
+
+
 # safe translator wrapper
-def do_translate(txt, tgt):
-    """Wrapper around GoogleTranslator"""
-    if not txt or not txt.strip():
+def do_translate(txt, tgt, src="auto"):
+    """Translate via the backend chain, backed by the translation memory"""
+    if not txt or not txt.strip() or src == tgt:
         return txt
+
+    cached = translation_memory.get(txt, src, tgt)
+    if cached is not None:
+        return cached
+
     try:
-        # ✅ The method is .translate(), NOT .do_translate()
-        return GoogleTranslator(source="auto", target=tgt).translate(txt)
+        result = translation_chain.translate(txt, src, tgt)
     except Exception as e:
-        print(f"⚠ Translation error (GoogleTranslator): {e}")
+        print(f"⚠ Translation error: {e}")
         return txt
 
+    # Failed calls return the source text above and are never stored
+    if result:
+        translation_memory.put(txt, src, tgt, result)
+    return result
 
 
-# Flexible text patterns in SCORM files (kept conservative)
-PATTERNS = [
-    # Match key-value text pairs like "label": "Hello world"
-    re.compile(r'(["\'](altText|title|text|label|caption|description|heading|content|name)["\']\s*:\s*["\'])([^"\']+)(["\'])'),
-
-    # Match inner HTML between tags
-    re.compile(r'>([^<]{3,200})<'),
-
-    # Match plain quoted text (e.g., "Welcome" or 'Click here')
-    re.compile(r'(["\'])([A-Za-z0-9\s,;:!?.@#&()_-]{3,200})(["\'])')
-]
-
+def do_translate_many(texts, tgt, on_progress=None, src="auto", accept=None):
+    """
+    Translate a list of segments, packing memory misses into batched requests.
+    Results keep the input order; failed segments come back as None.
+    accept(source, result) -> bool can reject a reply (e.g. one that lost a
+    placeholder); rejected replies count as failed and are never stored.
+    """
+    results = list(texts)
+    if src == tgt:
+        return results
+
+    pending = []
+    for i, txt in enumerate(texts):
+        if not txt or not txt.strip():
+            continue
+        cached = translation_memory.get(txt, src, tgt)
+        if cached is not None and (accept is None or accept(txt, cached)):
+            results[i] = cached
+        else:
+            pending.append(i)
 
-EXCLUDED = {"data.js", "frame.js", "paths.js", "configuration.js"}
-AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.m4a', '.flac', '.aac'}
+    translated = translation_chain.translate_many(
+        [texts[i] for i in pending], src, tgt, on_progress
+    )
+    for i, result in zip(pending, translated):
+        if result and accept is not None and not accept(texts[i], result):
+            print(f"⚠ Rejected translation with broken placeholders: {result[:60]}")
+            result = None
+        results[i] = result or None
+        if result:
+            translation_memory.put(texts[i], src, tgt, result)
+    return results
 
 
 # ── Metadata management ─────────────────────────────────────
@@ -140,7 +322,8 @@ def save_metadata(data):
             pass
 
 
-def add_course_metadata(pkg_id, filename, original_name):
+def add_course_metadata(pkg_id, filename, original_name, source_lang=None,
+                        previous_version=None):
     meta = load_metadata()
     if pkg_id not in meta:
         meta[pkg_id] = {
@@ -148,12 +331,29 @@ def add_course_metadata(pkg_id, filename, original_name):
             'original_name': original_name,
             'filename': filename,
             'uploaded_at': datetime.now().isoformat(),
+            'source_lang': source_lang or "auto",
             'translations': {}
         }
+        if previous_version:
+            meta[pkg_id]['previous_version'] = previous_version
         save_metadata(meta)
     return meta[pkg_id]
 
 
+def get_course_source_lang(pkg_id):
+    """Source language stored at upload; detected and saved for older courses"""
+    meta = load_metadata()
+    info = meta.get(pkg_id)
+    if info is not None and 'source_lang' in info:
+        return info['source_lang']
+
+    source_lang = detect_course_language(SCORM_SRC / pkg_id, get_course_inventory(pkg_id)) or "auto"
+    if info is not None:
+        info['source_lang'] = source_lang
+        save_metadata(meta)
+    return source_lang
+
+
 def add_translation_metadata(pkg_id, lang_code, lang_name, audio_count=0):
     meta = load_metadata()
     if pkg_id in meta:
@@ -166,71 +366,256 @@ def add_translation_metadata(pkg_id, lang_code, lang_name, audio_count=0):
         save_metadata(meta)
 
 
+# ── Course file inventory ───────────────────────────────────
+# Known third-party/runtime file hashes, from config plus past courses
+VENDOR_HASHES_FILE = Path(os.environ.get("VENDOR_HASHES_FILE", BASE / "vendor_hashes.json"))
+VENDOR_LEARN_MIN_COURSES = int(os.environ.get("VENDOR_LEARN_MIN_COURSES", "3"))
+vendor_index = VendorIndex(
+    CACHE_DIR / "vendor_index.json",
+    config_path=VENDOR_HASHES_FILE,
+    min_courses=VENDOR_LEARN_MIN_COURSES,
+)
+
+
+def inventory_path(pkg_id) -> Path:
+    return INVENTORIES / f"{pkg_id}.json"
+
+
+def create_course_inventory(pkg_id):
+    """Walk the uploaded course once and store its inventory"""
+    inventory = build_inventory(SCORM_SRC / pkg_id)
+    vendor_index.mark(inventory)
+    save_inventory(inventory, inventory_path(pkg_id))
+    print(f"🗂 Inventoried {len(inventory['files'])} files for {pkg_id}")
+    return inventory
+
+
+def get_course_inventory(pkg_id):
+    """Inventory stored at upload; built and saved for older courses"""
+    inventory = load_inventory(inventory_path(pkg_id))
+    if inventory is None:
+        return create_course_inventory(pkg_id)
+    # Pick up vendor hashes learned since the inventory was built
+    skipped, size = vendor_index.mark(inventory)
+    if skipped:
+        print(f"🚫 Skipping {skipped} known vendor files ({size // 1024} KB) in {pkg_id}")
+        save_inventory(inventory, inventory_path(pkg_id))
+    return inventory
+
+
+def course_lineage(pkg_id) -> str:
+    """Package id of the first upload in pkg_id's chain of "Upload New Version"s"""
+    meta = load_metadata()
+    seen = {pkg_id}
+    while True:
+        previous = meta.get(pkg_id, {}).get('previous_version')
+        if not previous or previous in seen:
+            return pkg_id
+        seen.add(previous)
+        pkg_id = previous
+
+
+def learn_vendor_files(pkg_id, course_dir: Path, inventory, file_segments):
+    """
+    Feed the vendor index with text files left without a single segment
+    after filtering; the ones shipped unchanged by several different
+    courses are runtime files. file_segments must already be filtered.
+    """
+    # Every version of a course counts as the same course
+    course = course_lineage(pkg_id)
+    hashes = {course_dir / f["path"]: f["hash"] for f in entries(inventory, "text")}
+    vendor_index.learn(course, [
+        hashes[path] for path, segs in file_segments.items()
+        if path in hashes and not segs
+    ])
+
+
+def copy_from_previous_version(pkg_id, target_lang, translate_audio, inventory, tgt_dir: Path):
+    """
+    Build tgt_dir for an updated course, taking every file whose path and
+    hash are unchanged from the previous version's translated output and the
+    rest from the new source. Returns the reused relative paths, or None when
+    there is no previous translation into target_lang to start from.
+    """
+    meta = load_metadata()
+    prev_id = meta.get(pkg_id, {}).get('previous_version')
+    prev_translation = meta.get(prev_id, {}).get('translations', {}).get(target_lang)
+    prev_dir = SCORM_TRANSLATED / f"{prev_id}_{target_lang}"
+    if not prev_translation or not prev_dir.exists():
+        return None
+
+    unchanged = unchanged_paths(get_course_inventory(prev_id), inventory)
+    # Previous audio is only worth reusing if that job translated it
+    reuse_audio = translate_audio and prev_translation.get('audio_files_translated', 0) > 0
+
+    reused = set()
+    for entry in inventory["files"]:
+        path = entry["path"]
+        src = SCORM_SRC / pkg_id / path
+        if path in unchanged and (entry["class"] != "audio" or reuse_audio):
+            if (prev_dir / path).exists():
+                src = prev_dir / path
+                reused.add(path)
+        dest = tgt_dir / path
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dest)
+
+    print(f"♻ Reused {len(reused)}/{len(inventory['files'])} files from {prev_id}_{target_lang}")
+    return reused
+
+
+# ── Glossary ────────────────────────────────────────────────
+def course_glossary_path(pkg_id) -> Path:
+    return GLOSSARIES / f"{pkg_id}.json"
+
+
+def load_glossary(pkg_id, target_lang) -> Glossary:
+    """
+    Global glossary merged with the course's own; an updated course without
+    one of its own inherits its previous version's
+    """
+    path = course_glossary_path(pkg_id)
+    previous = load_metadata().get(pkg_id, {}).get('previous_version')
+    if not path.exists() and previous:
+        path = course_glossary_path(previous)
+
+    glossary = Glossary.from_configs([load_config(GLOBAL_GLOSSARY), load_config(path)], target_lang)
+    if len(glossary):
+        print(f"📖 Glossary: {len(glossary)} terms for {target_lang}")
+    return glossary
+
+
 # ── Audio translation ───────────────────────────────────────
-def transcribe_audio(audio_path: Path) -> str:
-    """Convert audio to text using speech_recognition (Google)"""
+# Recognition requests in flight per clip; long clips are split at pauses
+ASR_CHUNK_WORKERS = int(os.environ.get("ASR_CHUNK_WORKERS", "4"))
+
+
+def recognize_chunk(chunk: AudioChunk) -> str:
+    """Recognize one chunk; a chunk with no recognizable words gives ''"""
     recognizer = sr.Recognizer()
-    temp_wav = TEMP_AUDIO / f"temp_{uuid.uuid4().hex}.wav"
+    with sr.AudioFile(wav_buffer(chunk.audio)) as source:
+        audio_data = recognizer.record(source)
     try:
-        audio = AudioSegment.from_file(str(audio_path))
-        audio.export(str(temp_wav), format="wav")
-
-        with sr.AudioFile(str(temp_wav)) as source:
-            audio_data = recognizer.record(source)
-            text = recognizer.recognize_google(audio_data)
-            return text
-    except Exception as e:
-        print(f"Error transcribing {audio_path.name}: {e}")
+        return recognizer.recognize_google(audio_data)
+    except sr.UnknownValueError:
         return ""
-    finally:
-        if temp_wav.exists():
-            try:
-                temp_wav.unlink()
-            except Exception:
-                pass
 
 
-def text_to_speech(text: str, lang_code: str, output_path: Path):
-    """Convert text to speech in target language"""
+def transcribe_segments(audio_path: Path) -> list:
+    """
+    Timed transcript of a clip: (start ms, end ms, text) per chunk, in order.
+    Chunks are recognized in parallel. Errors other than "no speech"
+    propagate, so a clip is never translated from a partial transcript.
+    """
+    # 16 kHz mono with silence compacted, so far less audio is uploaded
+    chunks = load_chunks(audio_path)
+    texts = run_bounded(chunks, recognize_chunk, max_workers=ASR_CHUNK_WORKERS)
+    return [(c.start_ms, c.end_ms, text) for c, text in zip(chunks, texts) if text]
+
+
+def transcribe_audio(audio_path: Path, audio_hash: str = None) -> list:
+    """
+    Convert audio to a timed transcript, [(start ms, end ms, text)], using
+    speech_recognition (Google) and reusing the transcript of any identical
+    clip seen before. Returns [] for silence or a failed recognition.
+    """
+    def recognize():
+        try:
+            segments = transcribe_segments(audio_path)
+        except Exception as e:
+            print(f"Error transcribing {audio_path.name}: {e}")
+            return None
+        if not segments:
+            print(f"  - No speech in {audio_path.name}")
+        return segments
+
+    segments = transcript_cache.get_or_transcribe(audio_hash or file_hash(audio_path), recognize)
+    return segments or []
+
+
+def text_to_speech(text: str, lang_code: str):
+    """Convert text to speech in target language; returns the MP3 bytes or None"""
     try:
         gtts_lang = GTTS_LANGS.get(lang_code, "en")
         tts = gTTS(text=text, lang=gtts_lang, slow=False)
-        tts.save(str(output_path))
-        return True
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        return buffer.getvalue()
     except Exception as e:
         print(f"Error generating speech: {e}")
-        return False
-
+        return None
 
-def translate_audio_file(audio_path: Path, target_lang: str, output_path: Path) -> bool:
-    """Full audio translation pipeline"""
-    try:
-        print(f"Processing audio: {audio_path.name}")
-        original_text = transcribe_audio(audio_path)
-        if not original_text:
-            print(f"  - Could not transcribe audio")
-            return False
 
-        print(f"  - Transcribed: {original_text[:50]}...")
-        translated_text = do_translate(original_text, target_lang)
-        print(f"  - Translated: {translated_text[:50]}...")
+# Workers per audio stage; each stage talks to a different service
+AUDIO_ASR_WORKERS = int(os.environ.get("AUDIO_ASR_WORKERS", "4"))
+AUDIO_MT_WORKERS = int(os.environ.get("AUDIO_MT_WORKERS", "4"))
+AUDIO_TTS_WORKERS = int(os.environ.get("AUDIO_TTS_WORKERS", "4"))
+AUDIO_QUEUE_SIZE = 8
 
-        success = text_to_speech(translated_text, target_lang, output_path)
-        if success:
-            print(f"  ✓ Successfully translated audio")
-        return success
 
-    except Exception as e:
-        print(f"Error translating audio {audio_path.name}: {e}")
-        return False
+def translate_audio_files(audio_files: list, target_lang: str, source_lang: str = "auto",
+                          glossary: Glossary = None, on_progress=None,
+                          audio_hashes: dict = None) -> int:
+    """
+    Audio translation pipeline: transcription, translation and speech
+    synthesis run as separate stages with their own workers, so clips
+    overlap instead of waiting on each service in turn. Each file is
+    replaced in place; failed clips keep their original audio.
+    audio_hashes ({path: content hash}, e.g. from the inventory) saves
+    rehashing clips for the transcript cache.
+    Returns how many files were translated.
+    """
+    audio_hashes = audio_hashes or {}
+
+    def transcribe(audio_path):
+        segments = transcribe_audio(audio_path, audio_hashes.get(audio_path))
+        text = " ".join(chunk for _, _, chunk in segments)
+        if not text:
+            print(f"  - Could not transcribe {audio_path.name}")
+            return None
+        print(f"  - Transcribed {audio_path.name}: {text[:50]}...")
+        return audio_path, text
+
+    def translate_text(job):
+        audio_path, text = job
+        if glossary:
+            translated = translate_with_glossary(
+                [text], glossary,
+                lambda texts: do_translate_many(
+                    texts, target_lang, src=source_lang, accept=placeholders_intact
+                ),
+            )[0]
+        else:
+            translated = do_translate(text, target_lang, source_lang)
+        return audio_path, translated
+
+    def synthesize(job):
+        audio_path, translated = job
+        # Speech is generated in memory, so a failed call never touches the
+        # original clip and a successful one is a single write
+        speech = text_to_speech(translated, target_lang)
+        if not speech:
+            return None
+        audio_path.write_bytes(speech)
+        print(f"  ✓ Translated audio {audio_path.name}")
+        return audio_path
+
+    results = run_pipeline(
+        list(audio_files),
+        [
+            Stage("transcribe", transcribe, AUDIO_ASR_WORKERS),
+            Stage("translate", translate_text, AUDIO_MT_WORKERS),
+            Stage("synthesize", synthesize, AUDIO_TTS_WORKERS),
+        ],
+        queue_size=AUDIO_QUEUE_SIZE,
+        on_done=on_progress,
+    )
+    return sum(1 for r in results if r is not None)
 
 
-def find_audio_files(directory: Path) -> list:
-    """Find all audio files in directory recursively"""
-    audio_files = []
-    for ext in AUDIO_EXTENSIONS:
-        audio_files.extend(directory.rglob(f"*{ext}"))
-    return audio_files
+def find_audio_files(directory: Path, inventory) -> list:
+    """Audio files of a course, resolved against directory (source or translated copy)"""
+    return [directory / f["path"] for f in entries(inventory, "audio")]
 
 
 # ── Core functions ──────────────────────────────────────────
@@ -246,19 +631,13 @@ def zip_dir(src_dir: Path, zip_path: Path):
                 z.write(p, p.relative_to(src_dir))
 
 
-def find_launch_file_from_manifest(course_folder: Path):
+def find_launch_file_from_manifest(course_folder: Path, inventory):
     """
     Parse imsmanifest.xml to find the official launch HTML file.
     Returns a Path if found, else None.
     """
-    manifest_path = None
-    for root, dirs, files in os.walk(course_folder):
-        for f in files:
-            if f.lower() == "imsmanifest.xml":
-                manifest_path = Path(root) / f
-                break
-        if manifest_path:
-            break
+    manifests = find_by_name(inventory, {"imsmanifest.xml"})
+    manifest_path = course_folder / manifests[0]["path"] if manifests else None
 
     if not manifest_path or not manifest_path.exists():
         print(f"⚠ No imsmanifest.xml found in {course_folder}")
@@ -283,56 +662,124 @@ def find_launch_file_from_manifest(course_folder: Path):
     return None
 
 
-def translate_storyline_js(file_path: Path, lang_code: str):
-    """Translate visible text inside Storyline, HTML, or XML files"""
-    if file_path.name in EXCLUDED:
-        return
+def find_text_files(course_dir: Path, inventory) -> list:
+    """Text-like files that may hold translatable strings"""
+    paths = [f["path"] for f in entries(inventory, "text")]
+    story = [p for p in paths if p.startswith("story_content/")]
+    if not story and any(f["path"].startswith("scormcontent/") for f in inventory["files"]):
+        # Rise 360: all course text lives in the data blob embedded in the
+        # top-level HTML; scormcontent/lib is the player runtime
+        rise_files = [course_dir / p for p in paths
+                      if p.startswith("scormcontent/") and p.count("/") == 1 and p.endswith(".html")]
+        print(f"🔍 Found {len(rise_files)} Rise *.html files under {course_dir / 'scormcontent'}")
+        return rise_files
 
-    try:
-        text = file_path.read_text("utf-8", errors="ignore")
-        translations_made = 0
-
-        def do(match):
-            nonlocal translations_made
-            src = None
-            groups = match.groups()
-            if len(groups) >= 3:
-                src = groups[2]
-            elif len(groups) >= 2:
-                src = groups[1]
-            else:
-                src = match.group(0)
-
-            if not src or len(src.strip()) < 3 or not any(c.isalpha() for c in src):
-                return match.group(0)
-
-            try:
-                tgt = do_translate(src, lang_code)
-                print(f"🧩 Translating text segment: {src[:80]} -> ({lang_code})")
-                if tgt and tgt != src:
-                    translations_made += 1
-                    prefix = match.group(1) if len(groups) >= 3 else ''
-                    suffix = match.group(4) if len(groups) >= 4 else ''
-                    return prefix + tgt + suffix
-            except Exception as e:
-                print(f"⚠ Translation error in {file_path.name}: {e}")
-            return match.group(0)
-
-        for pat in PATTERNS:
-            text = pat.sub(do, text)
-
-        if translations_made > 0:
-            file_path.write_text(text, "utf-8")
-            print(f"✓ Translated {translations_made} text blocks in {file_path.name}")
-            print(f"✅ Saved translated file: {file_path.name}")
+    text_files = [course_dir / p for p in story]
+    print(f"📁 Total text-like files queued for translation: {len(text_files)}")
+    return text_files
 
-        else:
-            print(f"⚠ No translatable text found in {file_path.name}")
 
+def detect_course_language(course_dir: Path, inventory):
+    """
+    Detect the course's source language once from a sample of its segments.
+    Files are scanned only until the sample is full, so detection at upload
+    doesn't repeat the whole extraction stage.
+    """
+    sample = set()
+    for file in find_text_files(course_dir, inventory):
+        kept, _, _ = filter_segments({file: extract_file(file)})
+        sample.update(seg.text.strip() for seg in kept[file] if qualifies(seg.text))
+        if len(sample) >= SAMPLE_SIZE:
+            break
+    source_lang = detect_language(sample)
+    print(f"🌐 Detected course language: {source_lang or 'unknown (auto)'}")
+    return source_lang
+
+
+# Wall-clock seconds one audio worker spends per second of narration
+# (transcription + translation + speech synthesis)
+ESTIMATE_AUDIO_FACTOR = float(os.environ.get("ESTIMATE_AUDIO_FACTOR", "1.5"))
+
+
+def probe_audio_seconds(audio_path: Path) -> float:
+    """Clip duration from the container header (ffprobe), without decoding it"""
+    try:
+        return float(mediainfo(str(audio_path)).get("duration", 0))
     except Exception as e:
-        print(f"Error processing {file_path.name}: {e}")
+        print(f"⚠ Could not probe {audio_path.name}: {e}")
+        return 0.0
 
 
+def estimate_translation(pkg_id, target_lang=None, include_audio=True) -> dict:
+    """
+    Dry run of a translation job: extraction and audio probing only, no
+    translation or speech calls. With target_lang, segments already in the
+    translation memory are counted as cache hits and left out of the
+    projected request count.
+    """
+    started = time.time()
+    src_dir = SCORM_SRC / pkg_id
+    inventory = get_course_inventory(pkg_id)
+    source_lang = get_course_source_lang(pkg_id)
+
+    file_segments, dropped, examples = filter_segments(
+        extract_files(find_text_files(src_dir, inventory))
+    )
+    sources = list(dict.fromkeys(seg.text for segs in file_segments.values() for seg in segs))
+    scan_seconds = time.time() - started
+
+    # Glossary-only segments never reach the translator; the rest are looked
+    # up the way the job sends them, with terms swapped for placeholders
+    glossary = load_glossary(pkg_id, target_lang) if target_lang else Glossary()
+    local = {t for t in sources if glossary.local_translation(t) is not None}
+    to_send = [glossary.protect(t)[0] for t in sources if t not in local]
+
+    cached = set()
+    if target_lang and target_lang != source_lang:
+        cached = translation_memory.find_cached(to_send, source_lang, target_lang)
+    pending = [t for t in to_send if t not in cached]
+
+    # Requests the primary backend would need once segments are batched
+    primary = translation_chain.backends[0] if translation_chain.backends else None
+    max_chars = primary.max_chars if primary else 4900
+    max_encoded = primary.max_encoded if primary else None
+    limiter = getattr(primary, "limiter", None)
+    request_rate = limiter.bucket.rate if limiter else TRANSLATION_WORKERS
+    request_count = len(pack_batches(pending, max_chars, max_encoded)) if pending else 0
+
+    audio_files = find_audio_files(src_dir, inventory) if include_audio else []
+    audio_seconds = sum(probe_audio_seconds(f) for f in audio_files)
+
+    text_seconds = request_count / request_rate
+    # Audio stages overlap; the pipeline runs at the pace of its narrowest stage
+    audio_workers = max(min(AUDIO_ASR_WORKERS, AUDIO_MT_WORKERS, AUDIO_TTS_WORKERS), 1)
+    audio_wall_seconds = audio_seconds * ESTIMATE_AUDIO_FACTOR / audio_workers
+    # The real job scans twice: extraction, then the apply stage
+    total_seconds = scan_seconds * 2 + text_seconds + audio_wall_seconds
+    return {
+        "pkg_id": pkg_id,
+        "source_lang": source_lang,
+        "target_lang": target_lang,
+        "text_files": len(file_segments),
+        "segments": sum(len(segs) for segs in file_segments.values()),
+        "unique_segments": len(sources),
+        "glossary_segments": len(local),
+        "filtered_segments": dict(dropped),
+        "filtered_examples": examples,
+        "total_characters": sum(len(t) for t in sources),
+        "characters_to_translate": sum(len(t) for t in pending),
+        "expected_cache_hit_rate": round(len(cached) / len(sources), 3) if sources and target_lang else None,
+        "translation_requests": request_count,
+        "audio_files": len(audio_files),
+        "audio_seconds": round(audio_seconds, 1),
+        "projected_seconds": {
+            "scan": round(scan_seconds, 1),
+            "text": round(text_seconds, 1),
+            "audio": round(audio_wall_seconds, 1),
+            "total": round(total_seconds, 1),
+        },
+    }
+
 
 # ── Background worker used by /translate route ─────────────
 def background_translate(pkg_id, lang_name, target_lang, translate_audio):
@@ -347,61 +794,92 @@ def background_translate(pkg_id, lang_name, target_lang, translate_audio):
         set_progress(pkg_id, "Copying course files for translation...", 5)
         if tgt_dir.exists():
             shutil.rmtree(tgt_dir)
-        shutil.copytree(src_dir, tgt_dir)
-
-        # Text translation
-        set_progress(pkg_id, "Translating text files...", 15)
-        js_root = tgt_dir / "story_content"
-       # if not js_root.exists():
-        #    js_root = tgt_dir / "scormcontent"
-        # if not js_root.exists():
-         #   js_root = tgt_dir
+        inventory = get_course_inventory(pkg_id)
 
-        
-        text_files = []
-        for ext in ("*.js", "*.html", "*.xml", "*.json"):
-            found = list(js_root.rglob(ext))
-            print(f"🔍 Found {len(found)} {ext} files under {js_root}")
-            text_files.extend(found)
+        # Updated courses start from the previous version's translation and
+        # only process new or changed files
+        reused = copy_from_previous_version(pkg_id, target_lang, translate_audio, inventory, tgt_dir)
+        if reused is None:
+            shutil.copytree(src_dir, tgt_dir)
+            reused = set()
 
-        print(f"📁 Total text-like files queued for translation: {len(text_files)}")
+        source_lang = get_course_source_lang(pkg_id)
+        print(f"🌐 Course source language: {source_lang}")
 
-
-        total_text_files = len(text_files)
-        for i, file in enumerate(text_files, 1):
-            translate_storyline_js(file, target_lang)
-            percent = 15 + int(i / max(total_text_files, 1) * 40)
-            set_progress(pkg_id, f"Translated {i}/{total_text_files} text files...", percent)
+        # Text translation
+        set_progress(pkg_id, "Translating text files...", 15)
+        text_files = [f for f in find_text_files(tgt_dir, inventory)
+                      if f.relative_to(tgt_dir).as_posix() not in reused]
+
+        # Phase 1: extract segments (in worker processes) and collect the
+        # unique ones across the course
+        def report_scan(done, total):
+            percent = 15 + int(done / max(total, 1) * 5)
+            set_progress(pkg_id, f"Scanned {done}/{total} text files...", percent)
+
+        file_segments = extract_files(text_files, on_progress=report_scan)
+
+        # Drop identifiers, paths, URLs and other non-prose candidates
+        file_segments, dropped, examples = filter_segments(file_segments)
+        learn_vendor_files(pkg_id, tgt_dir, inventory, file_segments)
+        if dropped:
+            print(f"🧹 Dropped {sum(dropped.values())} non-prose strings: {dict(dropped)}")
+            for rule, sample in examples.items():
+                print(f"   {rule}: {sample}")
+        course_segments = {}
+        for segs in file_segments.values():
+            for seg in segs:
+                course_segments[seg.text] = course_segments.get(seg.text, 0) + 1
+
+        total_segments = len(course_segments)
+        occurrences = sum(course_segments.values())
+        print(f"📦 Collected {total_segments} unique segments ({occurrences} occurrences)")
+
+        # Phase 2: translate each unique segment once, in concurrent batched requests
+        throughput = Throughput()
+
+        def report(done, total):
+            throughput.count = done
+            percent = 20 + int(done / max(total, 1) * 30)
+            set_progress(
+                pkg_id,
+                f"Translated {done}/{total} text segments ({throughput.rate:.1f}/s)...",
+                percent,
+            )
+
+        # Glossary terms are protected with placeholders (built once per job)
+        glossary = load_glossary(pkg_id, target_lang)
+        sources = list(course_segments)
+        translations = dict(zip(sources, translate_with_glossary(
+            sources, glossary,
+            lambda texts: do_translate_many(
+                texts, target_lang, report, source_lang, accept=placeholders_intact
+            ),
+        )))
+
+        # Phase 3: apply the course-level table back to every file
+        def report_apply(done, total):
+            percent = 50 + int(done / max(total, 1) * 5)
+            set_progress(pkg_id, f"Updated {done}/{total} text files...", percent)
+
+        apply_files(file_segments, translations, on_progress=report_apply)
 
 
 
         # Audio translation
         audio_count = 0
         if translate_audio:
-            audio_files = find_audio_files(tgt_dir)
-            total_audio = len(audio_files)
-            if total_audio > 0:
-                for i, audio_file in enumerate(audio_files, 1):
-                    set_progress(pkg_id, f"Translating audio {i}/{total_audio}...", 60 + int(i / max(total_audio, 1) * 30))
-                    output_path = audio_file
-                    backup_path = audio_file.with_suffix(audio_file.suffix + '.original')
-                    try:
-                        shutil.copy2(audio_file, backup_path)
-                    except Exception:
-                        pass
-                    success = translate_audio_file(audio_file, target_lang, output_path)
-                    if success:
-                        audio_count += 1
-                        try:
-                            backup_path.unlink()
-                        except Exception:
-                            pass
-                    else:
-                        try:
-                            shutil.copy2(backup_path, audio_file)
-                            backup_path.unlink()
-                        except Exception:
-                            pass
+            audio_files = [f for f in find_audio_files(tgt_dir, inventory)
+                           if f.relative_to(tgt_dir).as_posix() not in reused]
+
+            def report_audio(done, total):
+                percent = 60 + int(done / max(total, 1) * 30)
+                set_progress(pkg_id, f"Translated audio {done}/{total}...", percent)
+
+            audio_hashes = {tgt_dir / f["path"]: f["hash"] for f in entries(inventory, "audio")}
+            audio_count = translate_audio_files(
+                audio_files, target_lang, source_lang, glossary, report_audio, audio_hashes
+            )
 
         set_progress(pkg_id, "Packaging translated SCORM...", 95)
         out_zip = ZIPS / f"{pkg_id}_{target_lang}.zip"
@@ -450,6 +928,12 @@ def upload():
         flash("Upload a .zip file.", "error")
         return redirect("/")
 
+    # Set when uploading a new version of an existing course
+    previous_version = request.form.get("previous_pkg_id") or None
+    if previous_version and previous_version not in load_metadata():
+        flash("Previous version not found; uploading as a new course.", "info")
+        previous_version = None
+
     original_name = Path(file.filename).stem
     pkg_id = f"{original_name}-{uuid.uuid4().hex[:5]}"
     src_dir = SCORM_SRC / pkg_id
@@ -465,7 +949,9 @@ def upload():
         flash(f"Error extracting ZIP file: {e}", "error")
         return redirect("/")
 
-    add_course_metadata(pkg_id, file.filename, original_name)
+    inventory = create_course_inventory(pkg_id)
+    source_lang = detect_course_language(src_dir, inventory)
+    add_course_metadata(pkg_id, file.filename, original_name, source_lang, previous_version)
     flash(f"Successfully uploaded: {original_name}", "success")
     return redirect(url_for("library"))
 
@@ -504,19 +990,18 @@ def play():
         flash("Course folder not found.", "error")
         return redirect(url_for("library"))
 
+    # The source inventory lists the same relative paths as every translated copy
+    inventory = get_course_inventory(pkg)
+
     # 1️⃣ Try manifest-based launch detection first
-    launch = find_launch_file_from_manifest(folder)
+    launch = find_launch_file_from_manifest(folder, inventory)
 
-    # 2️⃣ Fallback to scanning for common HTML entry files
+    # 2️⃣ Fallback to the shallowest common HTML entry file
     if not launch:
         launch_candidates = {"index_lms.html", "index.html", "story.html", "launch.html", "player.html"}
-        for root, _, files in os.walk(folder):
-            for f in files:
-                if f.lower() in launch_candidates:
-                    launch = Path(root) / f
-                    break
-            if launch:
-                break
+        found = find_by_name(inventory, launch_candidates)
+        if found:
+            launch = folder / found[0]["path"]
 
     if not launch:
         flash(f"No valid launch file found in {folder.name}", "error")
@@ -566,6 +1051,13 @@ def delete(pkg):
         except Exception:
             pass
 
+    # Delete the file inventory and glossary
+    for path in (inventory_path(pkg), course_glossary_path(pkg)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
     # Update metadata
     meta = load_metadata()
     if pkg in meta:
@@ -581,7 +1073,8 @@ def translate_node():
     d = request.get_json(force=True)
     txt = d.get('text', '')
     tgt = d.get('target', 'fr')
-    return jsonify({'t': do_translate(txt, tgt)})
+    src = d.get('source', 'auto')
+    return jsonify({'t': do_translate(txt, tgt, src)})
 
 
 @app.route('/test-translation')
@@ -0,0 +1,98 @@
+"""
+Audio preparation for speech recognition: decode, downsample to 16 kHz
+mono, compact silence and split long clips at pauses, all in memory.
+"""
+
+import io
+from typing import NamedTuple
+
+from pydub import AudioSegment
+from pydub.silence import detect_nonsilent
+
+# Speech recognition only needs 16 kHz mono; anything more is upload overhead
+ASR_SAMPLE_RATE = 16000
+
+# Pauses longer than SILENCE_MIN_MS (quieter than the clip's average loudness
+# by SILENCE_THRESH_DB) are cut down to SILENCE_KEEP_MS on each side of speech
+SILENCE_MIN_MS = 500
+SILENCE_THRESH_DB = 16
+SILENCE_KEEP_MS = 200
+
+# Long narration is recognized in chunks of at most this much audio, split
+# at pauses, so no single request has to carry a multi-minute clip
+CHUNK_MAX_MS = 30_000
+
+
+class AudioChunk(NamedTuple):
+    """A stretch of speech; start/end are offsets (ms) into the original clip"""
+    start_ms: int
+    end_ms: int
+    audio: AudioSegment
+
+
+def speech_ranges(audio: AudioSegment) -> list:
+    """[start, end] (ms) of every stretch of speech, relative to the clip's loudness"""
+    if len(audio) == 0 or audio.dBFS == float("-inf"):
+        return []
+    return detect_nonsilent(
+        audio,
+        min_silence_len=SILENCE_MIN_MS,
+        silence_thresh=audio.dBFS - SILENCE_THRESH_DB,
+        seek_step=10,
+    )
+
+
+def join_speech(audio: AudioSegment, ranges: list) -> AudioSegment:
+    """Concatenate speech ranges, keeping SILENCE_KEEP_MS of pause on each side"""
+    joined = AudioSegment.empty()
+    for start, end in ranges:
+        joined += audio[max(start - SILENCE_KEEP_MS, 0):min(end + SILENCE_KEEP_MS, len(audio))]
+    return joined
+
+
+def compact_silence(audio: AudioSegment) -> AudioSegment:
+    """
+    Trim leading/trailing silence and shorten long pauses. Returns an empty
+    segment for a clip with no speech at all.
+    """
+    return join_speech(audio, speech_ranges(audio))
+
+
+def chunk_on_silence(audio: AudioSegment, max_ms: int = CHUNK_MAX_MS) -> list:
+    """
+    Split a clip at pauses into chunks of at most max_ms of audio each, with
+    silence compacted inside every chunk. Speech that runs longer than
+    max_ms without a pause is cut hard.
+    """
+    ranges = []
+    for start, end in speech_ranges(audio):
+        while end - start > max_ms:
+            ranges.append([start, start + max_ms])
+            start += max_ms
+        ranges.append([start, end])
+
+    chunks = []
+    group = []
+    for start, end in ranges:
+        if group and end - group[0][0] > max_ms:
+            chunks.append(AudioChunk(group[0][0], group[-1][1], join_speech(audio, group)))
+            group = []
+        group.append([start, end])
+    if group:
+        chunks.append(AudioChunk(group[0][0], group[-1][1], join_speech(audio, group)))
+    return chunks
+
+
+def load_chunks(audio_path, max_ms: int = CHUNK_MAX_MS) -> list:
+    """Decode a clip to 16 kHz mono and split it into recognition-sized chunks"""
+    audio = AudioSegment.from_file(str(audio_path))
+    audio = audio.set_frame_rate(ASR_SAMPLE_RATE).set_channels(1)
+    return chunk_on_silence(audio, max_ms)
+
+
+def wav_buffer(audio: AudioSegment) -> io.BytesIO:
+    """WAV bytes in memory, ready for sr.AudioFile"""
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    buffer.seek(0)
+    return buffer
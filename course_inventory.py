@@ -0,0 +1,110 @@
+"""
+Course file inventory, built with a single os.scandir walk at upload time.
+
+Translation, audio discovery and playback query the inventory instead of
+rescanning the course tree. Paths are stored relative to the course root, so
+one inventory serves the source folder and every translated copy of it.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+TEXT_EXTENSIONS = {".js", ".html", ".htm", ".xml", ".json"}
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".m4a", ".flac", ".aac"}
+MEDIA_EXTENSIONS = {
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".bmp", ".ico",
+    ".mp4", ".webm", ".mov", ".m4v", ".swf",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+}
+
+# Directories holding player runtimes and third-party libraries
+VENDOR_DIRS = {"lib", "libs", "vendor", "node_modules", "mobile", "lms"}
+VENDOR_NAME_HINTS = ("jquery", "mathjax", "bootstrap", "scormdriver", "require.js", ".min.js")
+
+HASH_CHUNK = 1024 * 1024
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def classify(rel_path: str) -> str:
+    """text / audio / media / vendor / other, from the relative path alone"""
+    parts = rel_path.lower().split("/")
+    name = parts[-1]
+    ext = os.path.splitext(name)[1]
+    if ext in AUDIO_EXTENSIONS:
+        return "audio"
+    if ext in MEDIA_EXTENSIONS:
+        return "media"
+    if ext in TEXT_EXTENSIONS:
+        if any(p in VENDOR_DIRS for p in parts[:-1]) or any(h in name for h in VENDOR_NAME_HINTS):
+            return "vendor"
+        return "text"
+    return "other"
+
+
+def build_inventory(root: Path) -> dict:
+    """Walk the course tree once, recording path, size, mtime, hash and class"""
+    root = Path(root)
+    files = []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        rel = Path(entry.path).relative_to(root).as_posix()
+                        files.append({
+                            "path": rel,
+                            "size": st.st_size,
+                            "mtime": st.st_mtime,
+                            "hash": file_hash(entry.path),
+                            "class": classify(rel),
+                        })
+        except OSError as e:
+            print(f"⚠ Could not scan {current}: {e}")
+
+    files.sort(key=lambda f: f["path"])
+    return {"built_at": datetime.now().isoformat(), "files": files}
+
+
+def save_inventory(inventory: dict, path: Path):
+    with open(path, "w") as f:
+        json.dump(inventory, f)
+
+
+def load_inventory(path: Path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def entries(inventory: dict, file_class: str = None) -> list:
+    return [f for f in inventory["files"] if file_class is None or f["class"] == file_class]
+
+
+def unchanged_paths(old: dict, new: dict) -> set:
+    """Paths present in both inventories with identical content"""
+    old_hashes = {f["path"]: f["hash"] for f in old["files"]}
+    return {f["path"] for f in new["files"] if old_hashes.get(f["path"]) == f["hash"]}
+
+
+def find_by_name(inventory: dict, names) -> list:
+    """Entries whose file name (case-insensitive) is in names, shallowest first"""
+    names = {n.lower() for n in names}
+    found = [f for f in inventory["files"] if f["path"].rsplit("/", 1)[-1].lower() in names]
+    return sorted(found, key=lambda f: (f["path"].count("/"), f["path"]))
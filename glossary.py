@@ -0,0 +1,247 @@
+"""
+Glossary and do-not-translate terms.
+
+Terms are matched with an Aho-Corasick automaton built once per job, so a
+segment is scanned for every term in a single pass. Matched terms are
+swapped for placeholders ([G0], [G1], ...) before the translator call and
+replaced with the glossary translation (or the original, for
+do-not-translate terms) afterwards. Segments made up only of glossary terms
+are answered locally.
+
+Config files are JSON:
+
+    {
+      "do_not_translate": ["Acme Cloud", "SCORM"],
+      "terms": {"fr": {"dashboard": "tableau de bord"}}
+    }
+"""
+
+import json
+import re
+from collections import deque
+from pathlib import Path
+
+import markup
+
+PLACEHOLDER = "[G{}]"
+# Translators sometimes pad placeholders with spaces ("[ G0 ]")
+PLACEHOLDER_RE = re.compile(r"\[\s*G\s*(\d+)\s*\]")
+
+
+def has_words(text: str) -> bool:
+    """True if text has letters outside glossary and markup placeholders"""
+    return markup.has_text(PLACEHOLDER_RE.sub("", text))
+
+
+def placeholders_intact(sent: str, out: str) -> bool:
+    """True if out carries every [G<n>] placeholder of sent exactly once"""
+    expected = sorted(int(i) for i in PLACEHOLDER_RE.findall(sent))
+    return sorted(int(i) for i in PLACEHOLDER_RE.findall(out)) == expected
+
+
+def fold(text: str) -> str:
+    """Lowercase without changing length, so match offsets stay valid"""
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class TermMatcher:
+    """Aho-Corasick automaton over a fixed set of terms (case-insensitive)"""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+
+        for index, term in enumerate(self.terms):
+            state = 0
+            for ch in fold(term):
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(index)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def find_all(self, text: str):
+        """Yield (start, end, term index) for every occurrence, overlaps included"""
+        state = 0
+        for i, ch in enumerate(fold(text)):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for index in self.out[state]:
+                yield i + 1 - len(self.terms[index]), i + 1, index
+
+    def find(self, text: str) -> list:
+        """Leftmost-longest, non-overlapping whole-word matches"""
+        def whole_word(start, end):
+            before = text[start - 1] if start > 0 else ""
+            after = text[end] if end < len(text) else ""
+            return not (before.isalnum() and text[start].isalnum()) and \
+                not (after.isalnum() and text[end - 1].isalnum())
+
+        candidates = sorted(
+            (m for m in self.find_all(text) if whole_word(m[0], m[1])),
+            key=lambda m: (m[0], -(m[1] - m[0])),
+        )
+        matches = []
+        pos = 0
+        for start, end, index in candidates:
+            if start >= pos:
+                matches.append((start, end, index))
+                pos = end
+        return matches
+
+
+class Glossary:
+    """Terms for one course and target language; targets of None mean keep as-is"""
+
+    def __init__(self, terms: dict = None):
+        # folded term -> (term, translation or None)
+        self.entries = {}
+        for term, target in (terms or {}).items():
+            if term and term.strip():
+                self.entries[fold(term.strip())] = (term.strip(), target)
+        self.matcher = TermMatcher(term for term, _ in self.entries.values())
+
+    @classmethod
+    def from_configs(cls, configs, target_lang: str):
+        """Merge config dicts in order; later ones win"""
+        terms = {}
+        for config in configs:
+            for term in config.get("do_not_translate", []):
+                terms[term] = None
+            terms.update(config.get("terms", {}).get(target_lang, {}))
+        return cls(terms)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _target(self, text: str, start: int, end: int) -> str:
+        _, target = self.entries[fold(text[start:end])]
+        # Do-not-translate terms keep the casing used in the segment
+        return text[start:end] if target is None else target
+
+    def _matches(self, text: str) -> list:
+        """Term matches, skipping any that overlap a markup placeholder ([T0])"""
+        tags = [m.span() for m in markup.PLACEHOLDER_RE.finditer(text)]
+        return [
+            (start, end, index) for start, end, index in self.matcher.find(text)
+            if not any(start < tag_end and tag_start < end for tag_start, tag_end in tags)
+        ]
+
+    def local_translation(self, text: str):
+        """Translation built from glossary terms alone, or None if the segment has other words"""
+        protected, replacements = self.protect(text)
+        if not replacements or has_words(protected):
+            return None
+        return self.restore(protected, replacements)
+
+    def protect(self, text: str) -> tuple:
+        """Swap glossary terms for placeholders; returns (text, replacements)"""
+        if not self.entries:
+            return text, []
+        parts = []
+        replacements = []
+        pos = 0
+        for start, end, _ in self._matches(text):
+            parts.append(text[pos:start])
+            parts.append(PLACEHOLDER.format(len(replacements)))
+            replacements.append(self._target(text, start, end))
+            pos = end
+        if not replacements:
+            return text, []
+        parts.append(text[pos:])
+        return "".join(parts), replacements
+
+    @staticmethod
+    def restore(text: str, replacements: list):
+        """
+        Put glossary targets back in place of their placeholders. Returns
+        None if the translator dropped, duplicated or mangled one, since a
+        term would silently go missing.
+        """
+        if not replacements:
+            return text
+        found = [int(i) for i in PLACEHOLDER_RE.findall(text)]
+        if sorted(found) != list(range(len(replacements))):
+            return None
+        return PLACEHOLDER_RE.sub(lambda m: replacements[int(m.group(1))], text)
+
+
+def translate_with_glossary(texts: list, glossary: Glossary, translate_many) -> list:
+    """
+    Translate texts through translate_many(list) -> list (None for a failed
+    segment), answering glossary-only segments locally and protecting terms
+    in the rest. Results keep the input order; failed segments, and replies
+    whose placeholders don't line up, keep the original text so they aren't
+    written back half-translated. translate_many should reject the latter
+    itself (see placeholders_intact) so they never reach a cache.
+    """
+    results = list(texts)
+    pending = []
+    protected = []
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        sent, replacements = glossary.protect(text)
+        # Nothing left but placeholders and punctuation: answer locally
+        if replacements and not has_words(sent):
+            results[i] = Glossary.restore(sent, replacements)
+            continue
+        pending.append(i)
+        protected.append((sent, replacements))
+
+    translated = translate_many([p for p, _ in protected]) if pending else []
+    for i, (_, replacements), out in zip(pending, protected, translated):
+        restored = Glossary.restore(out, replacements) if out is not None else None
+        if restored is not None:
+            results[i] = restored
+    return results
+
+
+def config_error(config):
+    """What is wrong with a glossary config's shape, or None if it is valid"""
+    if not isinstance(config, dict):
+        return "Expected a JSON object"
+    keep = config.get("do_not_translate", [])
+    if not isinstance(keep, list) or not all(isinstance(t, str) for t in keep):
+        return '"do_not_translate" must be a list of strings'
+    terms = config.get("terms", {})
+    if not isinstance(terms, dict):
+        return '"terms" must map language codes to {term: translation}'
+    for lang, table in terms.items():
+        if not isinstance(table, dict) or not all(
+            isinstance(k, str) and isinstance(v, str) for k, v in table.items()
+        ):
+            return f'"terms.{lang}" must map terms to translation strings'
+    return None
+
+
+def load_config(path: Path) -> dict:
+    """Glossary config from disk; {} if it is missing, unreadable or malformed"""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    error = config_error(data)
+    if error:
+        print(f"⚠ Ignoring glossary {path}: {error}")
+        return {}
+    return data
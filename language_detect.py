@@ -0,0 +1,92 @@
+import re
+import unicodedata
+
+# Segments shorter than this say little about the language. Scripts without
+# spaces (Japanese, Chinese) are measured in characters instead.
+MIN_WORDS = 3
+MIN_CHARS = 12
+SAMPLE_SIZE = 500
+
+# Non-Latin scripts map straight onto one of the app's LANGS codes
+SCRIPT_LANGS = (
+    ("HIRAGANA", "ja"), ("KATAKANA", "ja"), ("HANGUL", "ko"),
+    ("CJK", "zh-cn"), ("ARABIC", "ar"), ("DEVANAGARI", "hi"), ("CYRILLIC", "ru"),
+)
+
+# High-frequency function words for the Latin-script languages in LANGS
+STOPWORDS = {
+    "en": {"the", "and", "of", "to", "is", "in", "you", "that", "for", "it",
+           "with", "this", "are", "on", "your", "be", "can", "will", "click", "next"},
+    "fr": {"le", "la", "les", "et", "des", "est", "une", "du", "en", "que",
+           "pour", "dans", "vous", "sur", "pas", "au", "avec", "cliquez", "votre", "suivant"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "mit", "sie", "den", "ein",
+           "zu", "von", "auf", "für", "eine", "im", "dem", "klicken", "ihre", "weiter"},
+    "es": {"el", "la", "los", "las", "y", "es", "una", "por", "con", "para",
+           "que", "del", "en", "se", "su", "al", "como", "haga", "clic", "siguiente"},
+    "it": {"il", "lo", "gli", "e", "di", "che", "è", "una", "per", "con",
+           "non", "del", "della", "sono", "le", "si", "fare", "clic", "avanti", "questo"},
+    "pt": {"o", "os", "as", "e", "de", "que", "é", "um", "uma", "para",
+           "com", "não", "do", "da", "em", "no", "na", "você", "clique", "próximo"},
+}
+
+WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+
+
+def qualifies(segment: str) -> bool:
+    """Long enough to say something about the language"""
+    return bool(segment) and (len(segment.split()) >= MIN_WORDS or len(segment.strip()) >= MIN_CHARS)
+
+
+def sample_segments(segments, size: int = SAMPLE_SIZE) -> list:
+    """Pick the longest distinct segments; short labels misdetect easily"""
+    unique = {s.strip() for s in segments if qualifies(s)}
+    return sorted(unique, key=len, reverse=True)[:size]
+
+
+def detect_script(text: str):
+    """Return a LANGS code if a non-Latin script dominates the letters, else None"""
+    counts = {}
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            continue
+        letters += 1
+        name = unicodedata.name(ch, "")
+        for prefix, lang in SCRIPT_LANGS:
+            if name.startswith(prefix):
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+    if not letters or not counts:
+        return None
+    # Japanese text mixes kana with kanji; any real share of kana wins
+    if counts.get("ja", 0) >= letters * 0.1:
+        return "ja"
+    lang, count = max(counts.items(), key=lambda kv: kv[1])
+    return lang if count >= letters * 0.3 else None
+
+
+def detect_language(segments):
+    """
+    Detect the dominant language of a course from its text segments.
+    Returns one of the app's LANGS codes, or None when unsure.
+    """
+    sample = sample_segments(segments)
+    if not sample:
+        return None
+
+    text = "\n".join(sample)
+    script_lang = detect_script(text)
+    if script_lang:
+        return script_lang
+
+    scores = dict.fromkeys(STOPWORDS, 0)
+    for word in WORD_RE.findall(text.lower()):
+        for lang, words in STOPWORDS.items():
+            if word in words:
+                scores[lang] += 1
+
+    ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+    (best, best_score), (_, runner_up) = ranked[0], ranked[1]
+    if best_score < 5 or best_score < runner_up * 1.5:
+        return None
+    return best
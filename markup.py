@@ -0,0 +1,61 @@
+"""
+Inline markup protection.
+
+A sentence like "Click <b>Next</b> to continue" is translated as one
+segment: inline tags are swapped for numbered placeholders ([T0], [T1], ...)
+before the translator call and put back afterwards. Block-level tags still
+separate segments.
+"""
+
+import re
+
+BLOCK_TAGS = (
+    "p|div|li|ul|ol|h[1-6]|td|th|tr|table|tbody|thead|tfoot|dd|dt|dl|blockquote|"
+    "section|article|header|footer|nav|figure|figcaption|caption|label|button|"
+    "pre|body|html|head|title|form|select|option"
+)
+INLINE_TAGS = (
+    "a|abbr|b|bdi|bdo|br|cite|code|em|font|i|kbd|mark|q|s|small|span|strong|sub|sup|u|wbr"
+)
+
+BLOCK_TAG_RE = re.compile(rf"(</?(?:{BLOCK_TAGS})\b[^<>]*>)", re.I)
+INLINE_TAG_RE = re.compile(rf"</?(?:{INLINE_TAGS})\b[^<>]*>", re.I)
+ANY_TAG_RE = re.compile(r"<[^<>]*>")
+
+PLACEHOLDER = "[T{}]"
+# Translators sometimes pad placeholders with spaces ("[ T0 ]")
+PLACEHOLDER_RE = re.compile(r"\[\s*T\s*(\d+)\s*\]")
+
+
+def protect(markup: str, tag_re=ANY_TAG_RE) -> tuple:
+    """Swap tags for placeholders; returns (text, tags in order)"""
+    tags = []
+
+    def swap(m):
+        tags.append(m.group(0))
+        return PLACEHOLDER.format(len(tags) - 1)
+
+    return tag_re.sub(swap, markup), tags
+
+
+def restore(text: str, tags: list):
+    """
+    Put tags back in place of their placeholders. Returns None if the
+    translator dropped or duplicated one, since the markup would break.
+    """
+    if not tags:
+        return text
+    found = [int(i) for i in PLACEHOLDER_RE.findall(text)]
+    if sorted(found) != list(range(len(tags))):
+        return None
+    return PLACEHOLDER_RE.sub(lambda m: tags[int(m.group(1))], text)
+
+
+def has_text(protected: str) -> bool:
+    """True if anything besides placeholders is worth translating"""
+    return any(c.isalpha() for c in PLACEHOLDER_RE.sub("", protected))
+
+
+def split_blocks(value: str) -> list:
+    """Split on block-level tags; runs of text and inline markup sit at even indexes"""
+    return BLOCK_TAG_RE.split(value)
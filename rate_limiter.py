@@ -0,0 +1,123 @@
+import time
+from threading import Condition, Lock
+
+
+class TokenBucket:
+    """Caps the request rate at `rate` per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """Drop any saved-up burst so requests resume at the steady rate"""
+        with self._lock:
+            self._refill()
+            self.tokens = 0
+
+
+class AimdConcurrency:
+    """
+    Concurrency limit with additive increase / multiplicative decrease.
+
+    Each successful request raises the limit by increase/limit (about
+    +increase per full window of requests); each throttled request
+    multiplies it by `decrease`.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32,
+                 increase: float = 1.0, decrease: float = 0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._cond = Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= max(int(self.limit), self.minimum):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, outcome: str = "ok"):
+        """Release a slot; outcome is "ok", "throttled" or "error" (no change)"""
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == "throttled":
+                self.limit = max(float(self.minimum), self.limit * self.decrease)
+            elif outcome == "ok":
+                self.limit = min(float(self.maximum), self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+
+class ProviderLimiter:
+    """
+    Paces every call to one translation provider, process-wide.
+
+    Calls pass through a token bucket and an AIMD concurrency gate. When
+    `is_throttle(exc)` says the provider pushed back (429/5xx), the limit is
+    cut, the bucket is drained and the call is retried with backoff.
+    """
+
+    def __init__(self, name: str, rate: float, is_throttle, initial: int = 4,
+                 minimum: int = 1, maximum: int = 32, retries: int = 2,
+                 backoff: float = 1.0):
+        self.name = name
+        self.bucket = TokenBucket(rate)
+        self.concurrency = AimdConcurrency(initial, minimum, maximum)
+        self.is_throttle = is_throttle
+        self.retries = retries
+        self.backoff = backoff
+        self.throttled = 0
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) under the limiter"""
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            self.concurrency.acquire()
+            outcome = "ok"
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not self.is_throttle(e):
+                    outcome = "error"
+                    raise
+                outcome = "throttled"
+                self.throttled += 1
+                self.bucket.drain()
+                if attempt == self.retries:
+                    raise
+                print(f"⏳ {self.name} throttled ({e}), backing off")
+            finally:
+                self.concurrency.release(outcome)
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.name,
+            "rate_per_second": self.bucket.rate,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "throttled": self.throttled,
+        }
@@ -0,0 +1,130 @@
+"""
+Structural extraction for Articulate Rise 360 exports.
+
+Rise embeds the whole course as base64-encoded JSON in scormcontent/index.html:
+
+    window.courseData = "eyJjb3Vyc2UiOnsi...";
+    (newer exports: ... = deserialize("eyJjb3Vyc2UiOnsi..."))
+
+The blob is decoded once, its text fields translated structurally, and the
+result re-encoded in place; the generic regex scanner never sees it. Fields
+are split on block-level tags only, so a paragraph with inline markup is
+translated as one segment.
+"""
+
+import base64
+import html
+import json
+import re
+
+import markup
+
+COURSE_DATA_RE = re.compile(
+    r"courseData\s*=\s*(?:deserialize\(\s*)?(?P<q>[\"'])(?P<data>[A-Za-z0-9+/=]+)(?P=q)"
+)
+
+# Keys whose string values are shown to the learner
+TEXT_KEYS = {
+    "title", "heading", "subheading", "paragraph", "description", "caption",
+    "text", "label", "feedback", "correct", "incorrect", "prompt", "front", "back",
+}
+# Every string under these keys is UI text (e.g. labelSet.labels.next)
+LABEL_CONTAINERS = {"labels"}
+
+
+def has_course_data(text: str) -> bool:
+    return "courseData" in text and COURSE_DATA_RE.search(text) is not None
+
+
+def decode(blob: str):
+    return json.loads(base64.b64decode(blob).decode("utf-8"))
+
+
+def encode(data) -> str:
+    dumped = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return base64.b64encode(dumped.encode("utf-8")).decode("ascii")
+
+
+def walk_text(node, in_labels=False):
+    """Yield (container, key) for every text-bearing string value"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, str):
+                if in_labels or key in TEXT_KEYS:
+                    yield node, key
+            else:
+                yield from walk_text(value, in_labels or key in LABEL_CONTAINERS)
+    elif isinstance(node, list):
+        for item in node:
+            yield from walk_text(item, in_labels)
+
+
+def text_nodes(value: str) -> list:
+    """
+    Split a field on block-level tags; runs of text and inline markup sit at
+    even indexes, block tags at odd ones
+    """
+    return markup.split_blocks(value)
+
+
+def node_source(node: str):
+    """
+    Source string for one text run (inline tags as placeholders), or None
+    if there's nothing to translate
+    """
+    src = html.unescape(markup.protect(node)[0]).strip()
+    return src if markup.has_text(src) else None
+
+
+def extract_segments(text: str) -> list:
+    """
+    (start, end, source text) for every text piece, where start/end is the
+    span of the base64 blob holding it
+    """
+    segments = []
+    for match in COURSE_DATA_RE.finditer(text):
+        try:
+            data = decode(match.group("data"))
+        except ValueError:
+            continue
+        start, end = match.span("data")
+        for container, key in walk_text(data):
+            for i, node in enumerate(text_nodes(container[key])):
+                src = node_source(node) if i % 2 == 0 else None
+                if src:
+                    segments.append((start, end, src))
+    return segments
+
+
+def translate_value(value: str, translations) -> tuple:
+    """Translate the text pieces of one field; returns (new value, changes)"""
+    pieces = text_nodes(value)
+    changed = 0
+    for i in range(0, len(pieces), 2):
+        src = node_source(pieces[i])
+        tgt = translations.get(src) if src else None
+        if tgt and tgt != src:
+            node = pieces[i]
+            restored = markup.restore(html.escape(tgt, quote=False), markup.protect(node)[1])
+            if restored is None:
+                continue
+            lead = node[:len(node) - len(node.lstrip())]
+            trail = node[len(node.rstrip()):]
+            pieces[i] = lead + restored + trail
+            changed += 1
+    return "".join(pieces), changed
+
+
+def rewrite_span(blob: str, translations) -> tuple:
+    """Translate one embedded course blob; returns (new blob, changes)"""
+    try:
+        data = decode(blob)
+    except ValueError:
+        return blob, 0
+    changed = 0
+    for container, key in walk_text(data):
+        container[key], n = translate_value(container[key], translations)
+        changed += n
+    if not changed:
+        return blob, 0
+    return encode(data), changed
@@ -0,0 +1,91 @@
+"""
+Heuristic filter between extraction and translation.
+
+The catch-all quoted-string pattern also matches CSS classes, event names,
+file paths, identifiers and URLs. Sending those to the translator wastes a
+call and can break the course when the "translation" is written back. Every
+candidate is checked against a precompiled rule set; how strict it is
+depends on where the string was found.
+"""
+
+import re
+from collections import Counter
+
+# Never prose, wherever they were found
+ALWAYS_RULES = (
+    ("url", re.compile(r"^(?:[a-z][a-z0-9+.-]*://|www\.|mailto:)\S+$", re.I)),
+    ("email", re.compile(r"^[\w.+-]+@[\w-]+(?:\.[\w-]+)+$")),
+    ("file", re.compile(
+        r"^\S*\.(?:js|css|html?|xml|json|png|jpe?g|gif|svg|webp|mp3|mp4|wav|ogg|woff2?|ttf|swf)$", re.I
+    )),
+    ("hex_colour", re.compile(r"^#(?:[0-9a-f]{3,4}|[0-9a-f]{6}|[0-9a-f]{8})$", re.I)),
+    ("css_value", re.compile(
+        r"^(?:-?\d*\.?\d+(?:px|em|rem|pt|vh|vw|ms|s|deg|%)\s*)+$|^(?:rgba?|hsla?)\(.*\)$", re.I
+    )),
+)
+
+# Code-shaped strings; only checked in JS string literals that no text key
+# vouches for (text between tags can legitimately read "Well-being" or "and/or")
+IDENTIFIER_RULES = (
+    ("path", re.compile(r"^\.{0,2}/\S*$|^[a-z0-9_.-]+(?:/[\w.-]+)+/?$")),
+    # Operators, or a whole-string call like "init()" (but not "item(s)")
+    ("code", re.compile(r"[{};=<>]|^[\w$.]+\((?!s\)$).*\)$")),
+    ("camel_case", re.compile(r"^[a-z]+(?:[A-Z][a-z0-9]*)+$|^(?:[A-Z][a-z0-9]+){2,}[A-Z0-9]\w*$")),
+    ("constant", re.compile(r"^[A-Z][A-Z0-9]*(?:_[A-Z0-9]+)+$")),
+    # Dotted, snake_case or namespaced names; plain hyphens are left to
+    # kebab_case so "Follow-up" and "Drag-and-drop" stay
+    ("identifier", re.compile(r"^[A-Za-z_$][\w$]*(?:[-._:][\w$]+)*[._:][\w$]+(?:[-._:][\w$]+)*$")),
+    # CSS classes and ids ("btn-primary", "slide-layer-2")
+    ("kebab_case", re.compile(r"^[a-z][a-z0-9]*(?:-[a-z0-9]+)+$")),
+)
+
+# Bare lowercase tokens ("click", "hidden", "mouseover") in JS string literals
+# are event names, CSS classes and enum values, not UI text
+LOWERCASE_TOKEN_RE = re.compile(r"^[a-z][a-z0-9]*$")
+
+# Keys whose values are shown to the learner; "name"/"content" are often ids
+PROSE_KEYS = {"altText", "title", "text", "label", "caption", "description", "heading"}
+
+
+def drop_reason(text: str, kind: str, key: str = ""):
+    """Name of the rule that marks text as non-prose, or None to keep it"""
+    text = text.strip()
+    for name, rule in ALWAYS_RULES:
+        if rule.match(text):
+            return name
+
+    # Structural course data, HTML text and learner-facing keys only lose
+    # the obvious cases above
+    if kind not in ("kv", "quoted") or key in PROSE_KEYS:
+        return None
+
+    for name, rule in IDENTIFIER_RULES:
+        if rule.search(text) if name == "code" else rule.match(text):
+            return name
+    if LOWERCASE_TOKEN_RE.match(text):
+        return "lowercase_token"
+    return None
+
+
+def filter_segments(file_segments: dict) -> tuple:
+    """
+    Drop non-prose segments from {path: segments}.
+    Returns (kept {path: segments}, Counter of dropped segments per rule,
+    {rule: a few example strings}).
+    """
+    kept = {}
+    dropped = Counter()
+    examples = {}
+    for path, segs in file_segments.items():
+        keep = []
+        for seg in segs:
+            reason = drop_reason(seg.text, seg.kind, seg.key)
+            if reason is None:
+                keep.append(seg)
+                continue
+            dropped[reason] += 1
+            sample = examples.setdefault(reason, [])
+            if len(sample) < 5 and seg.text not in sample:
+                sample.append(seg.text)
+        kept[path] = keep
+    return kept, dropped, examples
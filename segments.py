@@ -0,0 +1,258 @@
+"""
+Segment model for course text: an extraction stage that records where every
+translatable string sits, and a separate apply stage that splices
+translations back in with one write per file.
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+import markup
+import rise
+import storyline
+
+# Flexible text patterns in SCORM files (kept conservative), combined into one
+# scanner so each file is read left to right exactly once. Alternatives are
+# tried in this order at every position and matches never overlap.
+SEGMENT_PATTERN = re.compile(
+    # Match key-value text pairs like "label": "Hello world"
+    r'(?P<kv_key>["\'](?P<key>altText|title|text|label|caption|description|heading|content|name)["\']\s*:\s*(?P<kv_q>["\']))'
+    r'(?P<kv>[^"\']+)(?P=kv_q)'
+
+    # Match a block element's content when it holds inline tags, e.g.
+    # <p>Click <b>Next</b> to continue</p>, so the sentence stays one segment.
+    # Only tried right after a block open tag, with bounded possessive runs,
+    # so text that never reaches a block close tag fails fast
+    rf'|<(?:{markup.BLOCK_TAGS})\b[^<>]{{0,200}}+>'
+    rf'(?P<markup>[^<{{}}]{{0,500}}+'
+    rf'(?:</?(?:{markup.INLINE_TAGS})\b[^<>]{{0,200}}+>[^<{{}}]{{0,500}}+){{1,40}}+)'
+    rf'(?=</(?:{markup.BLOCK_TAGS})\s*>)'
+
+    # Match inner HTML between tags; braces mean we're looking at script code
+    # (e.g. "if (a > b) {"), where a match would swallow the key-value pairs
+    r'|>(?P<html>[^<{}]{3,200}+)(?=<)'
+
+    # Match plain quoted text (e.g., "Welcome" or 'Click here')
+    r'|(?P<q>["\'])(?P<quoted>[A-Za-z0-9\s,;:!?.@#&()_-]{3,200}+)(?P=q)'
+)
+
+# Scanning is CPU-bound regex work, so it runs in worker processes (the GIL
+# would serialize threads). Files are shipped in chunks to keep IPC overhead
+# small, and tiny courses skip the pool entirely.
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", os.cpu_count() or 1))
+SCAN_CHUNK_SIZE = 16
+MIN_FILES_FOR_POOL = 32
+
+EXCLUDED = {"paths.js", "configuration.js"}
+# Only translated through their globalProvideData payloads, never by regex
+STRUCTURAL_ONLY = {"data.js", "frame.js"}
+
+# Course formats whose text is embedded as structured data, checked in order.
+# Each module provides extract_segments(text) and rewrite_span(span, table).
+STRUCTURAL_EXTRACTORS = {
+    "storyline": (storyline.has_payloads, storyline),
+    "rise": (rise.has_course_data, rise),
+}
+
+
+class Segment(NamedTuple):
+    """
+    One translatable string. start/end are character offsets into the file's
+    decoded text. For structural kinds ("storyline", "rise") they cover the
+    whole embedded payload, which every string inside it shares.
+    """
+    file: Path
+    start: int
+    end: int
+    text: str          # for "markup", inline tags are [T<n>] placeholders
+    kind: str          # "kv", "markup", "html", "quoted", or a STRUCTURAL_EXTRACTORS key
+    quote: str = ""    # string delimiter to escape in translations ("kv"/"quoted")
+    key: str = ""      # property name the text was found under ("kv")
+
+
+def read_text(file_path: Path) -> str:
+    return file_path.read_text("utf-8", errors="ignore")
+
+
+def scan_segments(text: str) -> list:
+    """
+    Find every translatable span in one left-to-right pass.
+    Returns (start, end, source text, kind, quote char or "", key or "")
+    tuples in file order.
+    """
+    spans = []
+    for match in SEGMENT_PATTERN.finditer(text):
+        key = ""
+        if match.group("kv") is not None:
+            kind, quote, key = "kv", match.group("kv_q"), match.group("key")
+        elif match.group("markup") is not None:
+            kind, quote = "markup", ""
+        elif match.group("html") is not None:
+            kind, quote = "html", ""
+        else:
+            kind, quote = "quoted", match.group("q")
+
+        raw = match.group(kind)
+        src = raw.strip()
+        if len(src) < 3 or not any(c.isalpha() for c in src):
+            continue
+        # Keep surrounding whitespace (indentation between tags) out of the span
+        start = match.start(kind) + (len(raw) - len(raw.lstrip()))
+        end = start + len(src)
+        if kind == "markup":
+            src = markup.protect(src, markup.INLINE_TAG_RE)[0]
+            if not markup.has_text(src):
+                continue
+        spans.append((start, end, src, kind, quote, key))
+    return spans
+
+
+def structural_kind(text: str):
+    """Return the STRUCTURAL_EXTRACTORS key that understands this file, or None"""
+    for kind, (detect, _) in STRUCTURAL_EXTRACTORS.items():
+        if detect(text):
+            return kind
+    return None
+
+
+def extract_segments(file_path: Path, text: str) -> list:
+    """Segments for already-read file text"""
+    if file_path.name in EXCLUDED:
+        return []
+
+    kind = structural_kind(text)
+    if kind:
+        extractor = STRUCTURAL_EXTRACTORS[kind][1]
+        return [Segment(file_path, start, end, src, kind)
+                for start, end, src in extractor.extract_segments(text)]
+    if file_path.name in STRUCTURAL_ONLY:
+        return []
+    return [Segment(file_path, *span) for span in scan_segments(text)]
+
+
+def extract_file(file_path: Path) -> list:
+    """Extraction stage: every translatable segment in a file, file untouched"""
+    if file_path.name in EXCLUDED:
+        return []
+    try:
+        return extract_segments(file_path, read_text(file_path))
+    except Exception as e:
+        print(f"Error reading {file_path.name}: {e}")
+        return []
+
+
+def apply_file(file_path: Path, segments: list, translations) -> int:
+    """
+    Apply stage: splice translations (source text -> translated text) into
+    one file's segments and write it once. Returns how many strings changed.
+    Segments whose text no longer matches the file are left alone.
+    """
+    if not segments:
+        return 0
+
+    try:
+        text = read_text(file_path)
+        parts = []
+        pos = 0
+        changed = 0
+
+        # Structural segments share their payload span; rewrite each span once
+        spans = {}
+        for seg in segments:
+            spans.setdefault((seg.start, seg.end), seg)
+
+        for (start, end), seg in sorted(spans.items()):
+            if start < pos:
+                continue
+            if seg.kind in STRUCTURAL_EXTRACTORS:
+                extractor = STRUCTURAL_EXTRACTORS[seg.kind][1]
+                replacement, n = extractor.rewrite_span(text[start:end], translations)
+            elif seg.kind == "markup":
+                protected, tags = markup.protect(text[start:end], markup.INLINE_TAG_RE)
+                tgt = translations.get(seg.text)
+                if not tgt or tgt == seg.text or protected != seg.text:
+                    continue
+                replacement = markup.restore(tgt, tags)
+                if replacement is None:
+                    print(f"⚠ Inline tags lost in translation, kept original: {seg.text[:50]}")
+                    continue
+                n = 1
+            else:
+                tgt = translations.get(seg.text)
+                if not tgt or tgt == seg.text or text[start:end] != seg.text:
+                    continue
+                if seg.quote:
+                    # e.g. French "l'image" inside a single-quoted JS string
+                    tgt = tgt.replace(seg.quote, "\\" + seg.quote)
+                replacement, n = tgt, 1
+            if n:
+                parts.append(text[pos:start])
+                parts.append(replacement)
+                pos = end
+                changed += n
+
+        if changed > 0:
+            parts.append(text[pos:])
+            file_path.write_text("".join(parts), "utf-8")
+            print(f"✓ Translated {changed} text blocks in {file_path.name}")
+        return changed
+
+    except Exception as e:
+        print(f"Error processing {file_path.name}: {e}")
+        return 0
+
+
+def _extract_chunk(paths: list) -> list:
+    return [extract_file(path) for path in paths]
+
+
+def _apply_chunk(jobs: list) -> list:
+    return [apply_file(path, segs, table) for path, segs, table in jobs]
+
+
+def _run_chunked(worker, items: list, max_workers: int, on_progress=None) -> list:
+    """worker(chunk) -> one result per item; results come back in input order"""
+    chunks = [items[i:i + SCAN_CHUNK_SIZE] for i in range(0, len(items), SCAN_CHUNK_SIZE)]
+    results = [None] * len(chunks)
+    done = 0
+
+    if max_workers <= 1 or len(items) < MIN_FILES_FOR_POOL:
+        for i, chunk in enumerate(chunks):
+            results[i] = worker(chunk)
+            done += len(chunk)
+            if on_progress:
+                on_progress(done, len(items))
+    else:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+            futures = {pool.submit(worker, chunk): i for i, chunk in enumerate(chunks)}
+            for future in as_completed(futures):
+                i = futures[future]
+                results[i] = future.result()
+                done += len(chunks[i])
+                if on_progress:
+                    on_progress(done, len(items))
+
+    return [result for chunk in results for result in chunk]
+
+
+def extract_files(paths: list, max_workers: int = SCAN_WORKERS, on_progress=None) -> dict:
+    """Run the extraction stage over many files in parallel; {path: segments}"""
+    paths = list(paths)
+    return dict(zip(paths, _run_chunked(_extract_chunk, paths, max_workers, on_progress)))
+
+
+def apply_files(file_segments: dict, translations, max_workers: int = SCAN_WORKERS,
+                on_progress=None) -> int:
+    """
+    Run the apply stage over many files in parallel. Each worker only gets
+    the slice of the translation table its file needs. Returns total changes.
+    """
+    jobs = [
+        (path, segs, {seg.text: translations[seg.text] for seg in segs if seg.text in translations})
+        for path, segs in file_segments.items()
+        if segs
+    ]
+    return sum(_run_chunked(_apply_chunk, jobs, max_workers, on_progress))
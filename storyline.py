@@ -0,0 +1,118 @@
+"""
+Structural extraction for Articulate Storyline output.
+
+Storyline ships slide, frame and course data as JSON wrapped in a JS call:
+
+    window.globalProvideData('slide', '{"slideLayers":[...]}');
+
+Each payload is decoded and parsed once, only known text-bearing keys are
+visited, and changed payloads are re-serialized in place.
+"""
+
+import json
+import re
+
+# Single-quoted JS literal as the second argument; unrolled loop so multi-MB
+# payloads are matched in linear time
+PROVIDE_DATA_RE = re.compile(
+    r"globalProvideData\(\s*'(?P<kind>[^'\\]*)'\s*,\s*'(?P<payload>[^'\\]*(?:\\.[^'\\]*)*)'\s*\)",
+    re.S,
+)
+
+# Keys whose string values are shown to the learner
+TEXT_KEYS = {"text", "altText", "accText", "title", "caption", "label", "description"}
+
+JS_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)", re.S)
+JS_SIMPLE_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+
+
+def decode_js_string(body: str) -> str:
+    """Undo the escaping of a single-quoted JS string literal body"""
+    def unescape(m):
+        esc = m.group(1)
+        if esc[0] in "ux" and len(esc) > 1:
+            return chr(int(esc[1:], 16))
+        return JS_SIMPLE_ESCAPES.get(esc, esc)
+    return JS_ESCAPE_RE.sub(unescape, body)
+
+
+def encode_js_string(value: str) -> str:
+    """Escape text for the body of a single-quoted JS string literal"""
+    return (
+        value.replace("\\", "\\\\")
+        .replace("'", "\\'")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\u2028", "\\u2028")
+        .replace("\u2029", "\\u2029")
+    )
+
+
+def has_payloads(text: str) -> bool:
+    return "globalProvideData(" in text
+
+
+def walk_text(node):
+    """Yield (container, key) for every text-bearing string value"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if isinstance(value, str):
+                if key in TEXT_KEYS:
+                    yield node, key
+            else:
+                yield from walk_text(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from walk_text(item)
+
+
+def is_translatable(value: str) -> bool:
+    return any(c.isalpha() for c in value)
+
+
+def extract_segments(text: str) -> list:
+    """
+    (start, end, source text) for every text value, where start/end is the
+    span of the payload literal holding it; values in one payload share a span
+    """
+    segments = []
+    for match in PROVIDE_DATA_RE.finditer(text):
+        try:
+            data = json.loads(decode_js_string(match.group("payload")))
+        except ValueError:
+            continue
+        start, end = match.span("payload")
+        for container, key in walk_text(data):
+            value = container[key].strip()
+            if is_translatable(value):
+                segments.append((start, end, value))
+    return segments
+
+
+def translate_data(data, translations) -> int:
+    """Replace text values in a parsed payload; returns how many changed"""
+    changed = 0
+    for container, key in walk_text(data):
+        raw = container[key]
+        src = raw.strip()
+        tgt = translations.get(src)
+        if tgt and tgt != src:
+            # Spans carry their own spacing ("Welcome " + "back"), keep it
+            lead = raw[:len(raw) - len(raw.lstrip())]
+            trail = raw[len(raw.rstrip()):]
+            container[key] = lead + tgt + trail
+            changed += 1
+    return changed
+
+
+def rewrite_span(literal: str, translations) -> tuple:
+    """Translate one payload literal body; returns (new literal, changes)"""
+    try:
+        data = json.loads(decode_js_string(literal))
+    except ValueError:
+        return literal, 0
+    changed = translate_data(data, translations)
+    if not changed:
+        return literal, 0
+    dumped = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return encode_js_string(dumped), changed
@@ -0,0 +1,67 @@
+from glossary import Glossary, TermMatcher, placeholders_intact, translate_with_glossary
+
+
+def test_term_matcher_finds_overlapping_occurrences():
+    matcher = TermMatcher(["he", "she", "hers"])
+    found = {(start, end, matcher.terms[i]) for start, end, i in matcher.find_all("ushers")}
+    assert found == {(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")}
+
+
+def test_term_matcher_leftmost_longest():
+    matcher = TermMatcher(["Acme", "Acme Cloud", "Cloud Console"])
+    text = "Open acme cloud console now"
+    assert [text[s:e] for s, e, _ in matcher.find(text)] == ["acme cloud"]
+
+
+def test_term_matcher_whole_words_only():
+    matcher = TermMatcher(["cat"])
+    text = "cat, concatenate, Cat"
+    assert [(s, e) for s, e, _ in matcher.find(text)] == [(0, 3), (18, 21)]
+
+
+def test_local_translation_and_protect():
+    glossary = Glossary({"dashboard": "tableau de bord", "SCORM": None})
+    assert glossary.local_translation("Dashboard!") == "tableau de bord!"
+    assert glossary.local_translation("Open the dashboard") is None
+    assert glossary.protect("scorm dashboard tips") == \
+        ("[G0] [G1] tips", ["scorm", "tableau de bord"])
+
+
+def test_markup_placeholders_are_not_words_or_terms():
+    glossary = Glossary({"SCORM": None, "T0": "nope"})
+    assert glossary.local_translation("[T0]SCORM[T1]") == "[T0]SCORM[T1]"
+    assert glossary.protect("[T0]Use SCORM[T1]") == ("[T0]Use [G0][T1]", ["SCORM"])
+
+
+def test_translate_with_glossary_keeps_failed_segments():
+    glossary = Glossary({"Acme": None})
+    sent = []
+
+    def translate_many(texts):
+        sent.extend(texts)
+        return ["[G0] est génial", None]
+
+    results = translate_with_glossary(["Acme is great", "Hello", "[T0]Acme[T1]"], glossary,
+                                      translate_many)
+    assert results == ["Acme est génial", "Hello", "[T0]Acme[T1]"]
+    assert sent == ["[G0] is great", "Hello"]
+
+
+def test_restore_rejects_dropped_or_duplicated_placeholders():
+    assert Glossary.restore("Ouvrez [G0] [G1]", ["Acme Cloud", "tableau de bord"]) == \
+        "Ouvrez Acme Cloud tableau de bord"
+    assert Glossary.restore("Ouvrez le [G1] maintenant", ["Acme Cloud", "tableau de bord"]) is None
+    assert Glossary.restore("[G0] [G0] [G1]", ["Acme Cloud", "tableau de bord"]) is None
+    assert Glossary.restore("G0 G1", ["Acme Cloud", "tableau de bord"]) is None
+
+
+def test_broken_placeholders_keep_the_original():
+    glossary = Glossary({"Acme Cloud": None, "dashboard": "tableau de bord"})
+    text = "Open the Acme Cloud dashboard now"
+    sent, _ = glossary.protect(text)
+    assert not placeholders_intact(sent, "Ouvrez le [G1] maintenant")
+    assert not placeholders_intact(sent, "[G0] [G0] [G1]")
+    assert placeholders_intact(sent, "Ouvrez le [ G1 ] [G0] maintenant")
+
+    for reply in ("Ouvrez le [G1] maintenant", "[G0] [G0] [G1]", "G0 G1"):
+        assert translate_with_glossary([text], glossary, lambda texts: [reply]) == [text]
@@ -0,0 +1,53 @@
+import threading
+import time
+
+from rate_limiter import AimdConcurrency
+
+
+def test_additive_increase_up_to_maximum():
+    limiter = AimdConcurrency(initial=2, maximum=3)
+    for _ in range(2):
+        limiter.acquire()
+        limiter.release("ok")
+    assert 2.5 < limiter.limit < 3
+    for _ in range(50):
+        limiter.acquire()
+        limiter.release("ok")
+    assert limiter.limit == 3
+
+
+def test_multiplicative_decrease_down_to_minimum():
+    limiter = AimdConcurrency(initial=8, minimum=2)
+    limiter.acquire()
+    limiter.release("throttled")
+    assert limiter.limit == 4
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release("throttled")
+    assert limiter.limit == 2
+
+
+def test_errors_leave_limit_unchanged():
+    limiter = AimdConcurrency(initial=4)
+    limiter.acquire()
+    limiter.release("error")
+    assert limiter.limit == 4 and limiter.in_flight == 0
+
+
+def test_acquire_blocks_at_limit():
+    limiter = AimdConcurrency(initial=1, minimum=1)
+    limiter.acquire()
+    acquired = threading.Event()
+
+    def worker():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+    limiter.release("error")
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.in_flight == 1
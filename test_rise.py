@@ -0,0 +1,50 @@
+import base64
+import json
+
+import rise
+
+
+def blob(data) -> str:
+    return base64.b64encode(json.dumps(data).encode("utf-8")).decode("ascii")
+
+
+def test_base64_round_trip():
+    data = {"course": {"title": "Sécurité 101", "lessons": [{"heading": "日本語"}]}}
+    assert rise.decode(rise.encode(data)) == data
+
+
+def test_extract_and_rewrite_course_data():
+    data = {
+        "course": {
+            "title": "Safety",
+            "lessons": [{"paragraph": "<p>Click <b>Next</b> to continue</p><p>&nbsp;</p>"}],
+            "labelSet": {"labels": {"next": "Next"}},
+            "id": "abc123",
+        }
+    }
+    source = f'window.courseData = "{blob(data)}";'
+    assert rise.has_course_data(source)
+
+    segments = rise.extract_segments(source)
+    assert sorted(text for _, _, text in segments) == \
+        ["Click [T0]Next[T1] to continue", "Next", "Safety"]
+
+    start, end, _ = segments[0]
+    translations = {
+        "Safety": "Sécurité",
+        "Click [T0]Next[T1] to continue": "Cliquez sur [T0]Suivant[T1] pour continuer",
+        "Next": "Suivant",
+    }
+    rewritten, changed = rise.rewrite_span(source[start:end], translations)
+    assert changed == 3
+    course = rise.decode(rewritten)["course"]
+    assert course["title"] == "Sécurité"
+    assert course["lessons"][0]["paragraph"] == \
+        "<p>Cliquez sur <b>Suivant</b> pour continuer</p><p>&nbsp;</p>"
+    assert course["labelSet"]["labels"]["next"] == "Suivant"
+    assert course["id"] == "abc123"
+
+
+def test_dropped_placeholder_keeps_original_markup():
+    value = "<p>Click <b>Next</b></p>"
+    assert rise.translate_value(value, {"Click [T0]Next[T1]": "Cliquez Suivant"}) == (value, 0)
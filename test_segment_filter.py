@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+
+from segment_filter import drop_reason, filter_segments
+from segments import Segment
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("https://example.com/course", "url"),
+    ("www.example.com", "url"),
+    ("mailto:help@example.com", "url"),
+    ("help@example.com", "email"),
+    ("images/slide1.png", "file"),
+    ("story.html", "file"),
+    ("#ff9900", "hex_colour"),
+    ("12px 1.5em", "css_value"),
+    ("rgba(0, 0, 0, 0.5)", "css_value"),
+])
+def test_always_rules_apply_to_every_kind(text, reason):
+    for kind in ("kv", "quoted", "html", "markup"):
+        assert drop_reason(text, kind) == reason
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("./lib/player", "path"),
+    ("assets/fonts", "path"),
+    ("and/or", "path"),
+    ("x = 1", "code"),
+    ("if (a) { b(); }", "code"),
+    ("alert('done')", "code"),
+    ("jQuery.fn.init()", "code"),
+    ("onClickHandler", "camel_case"),
+    ("SlideLayerBase", "camel_case"),
+    ("MAX_ATTEMPTS", "constant"),
+    ("app.main", "identifier"),
+    ("nav_bar", "identifier"),
+    ("xlink:href", "identifier"),
+    ("btn-primary", "kebab_case"),
+    ("slide-layer-2", "kebab_case"),
+    ("drag-and-drop", "kebab_case"),
+    ("mouseover", "lowercase_token"),
+])
+def test_identifier_rules_drop_code_in_js_strings(text, reason):
+    assert drop_reason(text, "quoted") == reason
+    assert drop_reason(text, "html") is None
+
+
+@pytest.mark.parametrize("text", [
+    "Follow-up",
+    "Drag-and-drop",
+    "Well-being",
+    "Select item(s)",
+    "Step 1 (of 3)",
+    "Click Next to continue.",
+    "Welcome",
+])
+def test_prose_is_kept_in_js_strings(text):
+    assert drop_reason(text, "quoted") is None
+
+
+def test_prose_keys_only_lose_the_always_rules():
+    assert drop_reason("btn-primary", "kv", "label") is None
+    assert drop_reason("btn-primary", "kv", "name") == "kebab_case"
+    assert drop_reason("logo.png", "kv", "label") == "file"
+
+
+def test_filter_segments_counts_and_samples_drops():
+    path = Path("player.js")
+    segments = [
+        Segment(path, 0, 5, "Hello there", "quoted", '"'),
+        Segment(path, 10, 20, "btn-primary", "quoted", '"'),
+        Segment(path, 30, 40, "btn-primary", "quoted", '"'),
+    ]
+    kept, dropped, examples = filter_segments({path: segments})
+    assert kept == {path: segments[:1]}
+    assert dropped == {"kebab_case": 2}
+    assert examples == {"kebab_case": ["btn-primary"]}
@@ -0,0 +1,90 @@
+import json
+
+import storyline
+from segments import apply_file, extract_file
+
+
+def extract_and_apply(path, content, translations):
+    path.write_text(content, "utf-8")
+    segments = extract_file(path)
+    changed = apply_file(path, segments, translations)
+    return segments, changed, path.read_text("utf-8")
+
+
+def test_html_round_trip_trims_whitespace_and_keeps_inline_tags(tmp_path):
+    content = (
+        "<html><body>\n"
+        "  <h1>  Welcome aboard  </h1>\n"
+        '  <p class="intro">Click <b>Next</b> to continue</p>\n'
+        "</body></html>\n"
+    )
+    segments, changed, written = extract_and_apply(tmp_path / "index.html", content, {
+        "Welcome aboard": "Bienvenue à bord",
+        "Click [T0]Next[T1] to continue": "Cliquez sur [T0]Suivant[T1] pour continuer",
+    })
+    assert [(s.text, s.kind) for s in segments] == [
+        ("Welcome aboard", "html"),
+        ("Click [T0]Next[T1] to continue", "markup"),
+    ]
+    assert changed == 2
+    assert written == (
+        "<html><body>\n"
+        "  <h1>  Bienvenue à bord  </h1>\n"
+        '  <p class="intro">Cliquez sur <b>Suivant</b> pour continuer</p>\n'
+        "</body></html>\n"
+    )
+
+
+def test_lost_inline_tags_keep_the_original(tmp_path):
+    content = "<p>Click <b>Next</b> to continue</p>"
+    _, changed, written = extract_and_apply(tmp_path / "page.html", content, {
+        "Click [T0]Next[T1] to continue": "Cliquez sur Suivant pour continuer",
+    })
+    assert changed == 0
+    assert written == content
+
+
+def test_quote_in_translation_is_escaped(tmp_path):
+    content = "var title = 'Show the picture';\nvar cfg = {\"label\": \"Start course\"};\n"
+    _, changed, written = extract_and_apply(tmp_path / "player.js", content, {
+        "Show the picture": "Afficher l'image",
+        "Start course": 'Commencer le "cours"',
+    })
+    assert changed == 2
+    assert written == (
+        "var title = 'Afficher l\\'image';\n"
+        "var cfg = {\"label\": \"Commencer le \\\"cours\\\"\"};\n"
+    )
+
+
+def test_stale_span_is_skipped(tmp_path):
+    path = tmp_path / "lesson.html"
+    path.write_text("<h1>Welcome aboard</h1><h2>Second heading</h2>", "utf-8")
+    segments = extract_file(path)
+
+    # The file changed after extraction; its first span no longer matches
+    path.write_text("<h1>Welcome abroad</h1><h2>Second heading</h2>", "utf-8")
+    changed = apply_file(path, segments, {
+        "Welcome aboard": "Bienvenue à bord",
+        "Second heading": "Deuxième titre",
+    })
+    assert changed == 1
+    assert path.read_text("utf-8") == "<h1>Welcome abroad</h1><h2>Deuxième titre</h2>"
+
+
+def test_shared_structural_span_is_rewritten_once(tmp_path):
+    data = {"slideLayers": [{"text": "First line"}, {"text": "Second line"}]}
+    payload = storyline.encode_js_string(json.dumps(data))
+    content = f"window.globalProvideData('slide', '{payload}');"
+    segments, changed, written = extract_and_apply(tmp_path / "slide.js", content, {
+        "First line": "Première ligne",
+        "Second line": "Deuxième ligne",
+    })
+    assert len({(s.start, s.end) for s in segments}) == 1
+    assert changed == 2
+
+    match = storyline.PROVIDE_DATA_RE.search(written)
+    layers = json.loads(storyline.decode_js_string(match.group("payload")))["slideLayers"]
+    assert [layer["text"] for layer in layers] == ["Première ligne", "Deuxième ligne"]
+    assert written.startswith("window.globalProvideData('slide', '")
+    assert written.endswith("');")
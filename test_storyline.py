@@ -0,0 +1,28 @@
+import json
+
+import storyline
+
+
+def test_js_string_round_trip():
+    value = "It's a \"quote\"\\ path\nnew line\r\u2028sep\u2029end"
+    assert storyline.decode_js_string(storyline.encode_js_string(value)) == value
+
+
+def test_decode_js_string_escapes():
+    assert storyline.decode_js_string(r"café \x41\tB\'s") == "café A\tB's"
+
+
+def test_extract_and_rewrite_payload():
+    data = {"slideLayers": [{"text": " Welcome ", "id": "layer1"}, {"altText": "42"}]}
+    literal = storyline.encode_js_string(json.dumps(data))
+    source = f"window.globalProvideData('slide', '{literal}');"
+
+    segments = storyline.extract_segments(source)
+    assert [text for _, _, text in segments] == ["Welcome"]
+
+    start, end, _ = segments[0]
+    rewritten, changed = storyline.rewrite_span(source[start:end], {"Welcome": "Bienvenue l'ami"})
+    assert changed == 1
+    layers = json.loads(storyline.decode_js_string(rewritten))["slideLayers"]
+    assert layers[0] == {"text": " Bienvenue l'ami ", "id": "layer1"}
+    assert "'" not in rewritten.replace("\\'", "")
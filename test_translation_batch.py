@@ -0,0 +1,59 @@
+from translation_batch import (
+    BATCH_DELIMITER, encoded_length, pack_batches, split_batch, translate_batched,
+)
+
+
+def test_pack_batches_keeps_order_and_fits_limit():
+    texts = ["alpha", "beta", "gamma", "delta", "epsilon"]
+    batches = pack_batches(texts, max_chars=20)
+    assert [i for batch in batches for i in batch] == list(range(len(texts)))
+    for batch in batches:
+        assert len(BATCH_DELIMITER.join(texts[i] for i in batch)) <= 20
+
+
+def test_pack_batches_sends_unbatchable_segments_alone():
+    texts = ["one", "two\nlines", "three", "a ||| b", "x" * 50, "four"]
+    batches = pack_batches(texts, max_chars=40)
+    assert [1] in batches
+    assert [3] in batches
+    assert [4] in batches
+
+
+def test_pack_batches_respects_encoded_limit():
+    texts = ["こんにちは世界"] * 50
+    batches = pack_batches(texts, max_chars=4900, max_encoded=200)
+    assert len(batches) > 1
+    for batch in batches:
+        assert encoded_length(BATCH_DELIMITER.join(texts[i] for i in batch)) <= 200
+
+
+def test_split_batch_tolerates_translator_whitespace():
+    assert split_batch("Bonjour |||  Monde\n|||\nSalut", 3) == ["Bonjour", "Monde", "Salut"]
+
+
+def test_split_batch_rejects_misaligned_response():
+    assert split_batch("Bonjour ||| Monde", 3) is None
+    assert split_batch("Bonjour ||| ||| Salut", 3) is None
+    assert split_batch("", 1) is None
+
+
+def test_translate_batched_round_trip():
+    calls = []
+
+    def translate_one(text):
+        calls.append(text)
+        return text.upper()
+
+    texts = ["hello", "world", "multi\nline"]
+    assert translate_batched(texts, translate_one, max_workers=1) == ["HELLO", "WORLD", "MULTI\nLINE"]
+    assert len(calls) == 2
+
+
+def test_translate_batched_falls_back_to_single_segments():
+    def translate_one(text):
+        if BATCH_DELIMITER in text or text == "bad":
+            raise RuntimeError("rejected")
+        return text.upper()
+
+    assert translate_batched(["good", "bad", "fine"], translate_one, max_workers=1) == \
+        ["GOOD", None, "FINE"]
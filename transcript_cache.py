@@ -0,0 +1,134 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import Event, Lock
+
+
+class TranscriptCache:
+    """
+    Disk-backed (SQLite) speech recognition results keyed by the audio
+    file's content hash, with LRU eviction. A transcript is a list of
+    (start ms, end ms, text) chunks, so timings survive a cache hit.
+
+    The transcript depends only on the clip, so one entry serves every
+    target language and every course that ships the same clip. Concurrent
+    jobs asking for the same clip wait for a single recognition.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 50_000):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._inflight = {}
+        self._inserts_since_evict = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                audio_hash TEXT PRIMARY KEY,
+                segments TEXT NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, audio_hash: str):
+        """Return the stored [(start ms, end ms, text)] or None, refreshing its LRU position"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segments FROM transcripts WHERE audio_hash = ?", (audio_hash,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE transcripts SET last_used = ? WHERE audio_hash = ?",
+                (time.time(), audio_hash),
+            )
+            self._conn.commit()
+            return [tuple(segment) for segment in json.loads(row[0])]
+
+    def put(self, audio_hash: str, segments: list):
+        """Store a timed transcript ([] for a clip without speech), evicting LRU entries when full"""
+        if segments is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (audio_hash, segments, last_used) "
+                "VALUES (?, ?, ?)",
+                (audio_hash, json.dumps([list(segment) for segment in segments]), time.time()),
+            )
+            self._inserts_since_evict += 1
+            # Allow a small overshoot (1%) before trimming back to max_entries
+            if self._inserts_since_evict >= max(self.max_entries // 100, 1):
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._inserts_since_evict = 0
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM transcripts WHERE rowid IN ("
+                "SELECT rowid FROM transcripts ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def get_or_transcribe(self, audio_hash: str, transcribe):
+        """
+        Cached transcript, or transcribe() -> segments (None on failure) run once
+        per clip even when several jobs ask at the same time. Failures are
+        not cached.
+        """
+        cached = self.get(audio_hash)
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            pending = self._inflight.get(audio_hash)
+            if pending is None:
+                pending = self._inflight[audio_hash] = Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            pending.wait()
+            cached = self.get(audio_hash)
+            # The other job failed; try ourselves
+            return cached if cached is not None else transcribe()
+
+        try:
+            segments = transcribe()
+            self.put(audio_hash, segments)
+            return segments
+        finally:
+            with self._lock:
+                del self._inflight[audio_hash]
+            pending.set()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current entry count"""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM transcripts").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
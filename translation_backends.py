@@ -0,0 +1,278 @@
+import time
+from threading import Lock
+
+import requests
+from deep_translator import MyMemoryTranslator
+from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES, MY_MEMORY_LANGUAGES_TO_CODES
+
+from translation_batch import GOOGLE_CHAR_LIMIT, GOOGLE_ENCODED_LIMIT, translate_batched
+from translation_engine import DEFAULT_WORKERS
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open"""
+
+
+class AllBackendsFailed(Exception):
+    """Raised when no backend in the chain could translate a segment"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls for
+    `reset_after` seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 60.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def resolve_code(code: str, supported) -> str:
+    """Map one of our LANGS codes (e.g. "zh-cn") onto a provider's spelling"""
+    if code == "auto" or code in supported:
+        return code
+    for candidate in supported:
+        if candidate.lower() == code.lower():
+            return candidate
+    # Region-qualified providers: prefer "fr-FR" over "fr-BE" for "fr"
+    base = code.split("-")[0].lower()
+    regional = [c for c in supported if c.lower().split("-")[0] == base]
+    for candidate in regional:
+        if candidate.lower() == f"{base}-{base}":
+            return candidate
+    return regional[0] if regional else code
+
+
+class TranslationBackend:
+    """
+    Base class for translation providers.
+
+    Subclasses implement translate(); translate_many() and the circuit
+    breaker come for free. `max_chars` bounds a single request, and
+    `max_encoded` its percent-encoded size for backends that send text in
+    the URL.
+    """
+
+    name = "base"
+    max_chars = GOOGLE_CHAR_LIMIT
+    max_encoded = None
+
+    def __init__(self, breaker: CircuitBreaker = None, max_workers: int = DEFAULT_WORKERS):
+        self.breaker = breaker or CircuitBreaker()
+        self.max_workers = max_workers
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        """Translate one request worth of text; raises on failure"""
+        raise NotImplementedError
+
+    def supported_languages(self) -> set:
+        """Lower-case language codes this backend accepts"""
+        raise NotImplementedError
+
+    def supports(self, source: str, target: str) -> bool:
+        codes = self.supported_languages()
+        return (source == "auto" or source.lower() in codes) and target.lower() in codes
+
+    def call(self, text: str, source: str, target: str) -> str:
+        """translate() guarded by the circuit breaker"""
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        try:
+            result = self.translate(text, source, target)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def translate_many(self, texts: list, source: str, target: str, on_progress=None) -> list:
+        """Translate many segments in packed batches; failed segments are None"""
+        return translate_batched(
+            texts,
+            lambda batch: self.call(batch, source, target),
+            max_chars=self.max_chars,
+            on_progress=on_progress,
+            max_workers=self.max_workers,
+            max_encoded=self.max_encoded,
+        )
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "circuit": self.breaker.state,
+                "consecutive_failures": self.breaker.failures}
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate web endpoint via the pooled keep-alive clients"""
+
+    name = "google"
+    max_encoded = GOOGLE_ENCODED_LIMIT
+    codes = set(GOOGLE_LANGUAGES_TO_CODES.values())
+
+    def __init__(self, pool, limiter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.pool = pool
+        self.limiter = limiter
+
+    def translate(self, text, source, target):
+        client = self.pool.get(resolve_code(source, self.codes), resolve_code(target, self.codes))
+        if self.limiter:
+            return self.limiter.call(client.translate, text)
+        return client.translate(text)
+
+    def supported_languages(self):
+        return {c.lower() for c in self.codes}
+
+    def stats(self):
+        data = super().stats()
+        if self.limiter:
+            data["limiter"] = self.limiter.stats()
+        return data
+
+
+class MyMemoryBackend(TranslationBackend):
+    """MyMemory public API; small requests only"""
+
+    name = "mymemory"
+    max_chars = 499
+    codes = set(MY_MEMORY_LANGUAGES_TO_CODES.values())
+
+    def __init__(self, limiter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def translate(self, text, source, target):
+        translator = MyMemoryTranslator(
+            source=resolve_code(source, self.codes), target=resolve_code(target, self.codes)
+        )
+        if self.limiter:
+            return self.limiter.call(translator.translate, text)
+        return translator.translate(text)
+
+    def supported_languages(self):
+        codes = {c.lower() for c in self.codes}
+        return codes | {c.split("-")[0] for c in codes}
+
+
+class HttpStubBackend(TranslationBackend):
+    """
+    Backend for a local HTTP translation stub (see translation_stub_server.py),
+    so the whole chain can be exercised and load-tested offline.
+    """
+
+    name = "stub"
+
+    def __init__(self, url: str, session: requests.Session = None, limiter=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.session = session or requests.Session()
+        self.limiter = limiter
+
+    def _post(self, text, source, target):
+        response = self.session.post(
+            self.url, json={"q": text, "source": source, "target": target}, timeout=15
+        )
+        response.raise_for_status()
+        return response.json()["translatedText"]
+
+    def translate(self, text, source, target):
+        if self.limiter:
+            return self.limiter.call(self._post, text, source, target)
+        return self._post(text, source, target)
+
+    def supported_languages(self):
+        return {c.lower() for c in GOOGLE_LANGUAGES_TO_CODES.values()}
+
+    def stats(self):
+        data = super().stats()
+        if self.limiter:
+            data["limiter"] = self.limiter.stats()
+        return data
+
+
+class BackendChain:
+    """Ordered list of backends; each segment goes to the first one that succeeds"""
+
+    def __init__(self, backends: list):
+        self.backends = backends
+
+    def _candidates(self, source, target):
+        return [b for b in self.backends if b.supports(source, target)]
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        errors = []
+        for backend in self._candidates(source, target):
+            if backend.breaker.state == "open":
+                continue
+            try:
+                return backend.call(text, source, target)
+            except Exception as e:
+                errors.append(f"{backend.name}: {e}")
+        raise AllBackendsFailed("; ".join(errors) or "no backend available")
+
+    def translate_many(self, texts: list, source: str, target: str, on_progress=None) -> list:
+        """
+        Translate many segments; whatever a backend fails on moves down the
+        chain. Segments no backend could translate come back as None.
+        """
+        results = [None] * len(texts)
+        remaining = list(range(len(texts)))
+        for backend in self._candidates(source, target):
+            if not remaining:
+                break
+            if backend.breaker.state == "open":
+                print(f"⚠ Skipping {backend.name}: circuit open")
+                continue
+            translated = backend.translate_many(
+                [texts[i] for i in remaining], source, target, on_progress
+            )
+            # Only the first backend attempted drives the progress display
+            on_progress = None
+            failed = []
+            for i, out in zip(remaining, translated):
+                if out:
+                    results[i] = out
+                else:
+                    failed.append(i)
+            if failed:
+                print(f"⚠ {backend.name} failed on {len(failed)} segments, trying next backend")
+            remaining = failed
+        return results
+
+    def stats(self) -> list:
+        return [b.stats() for b in self.backends]
@@ -0,0 +1,135 @@
+import re
+from urllib.parse import quote_plus
+
+from translation_engine import DEFAULT_WORKERS, run_bounded
+
+# Google's web endpoint rejects payloads of 5000 characters or more
+GOOGLE_CHAR_LIMIT = 4900
+# The pooled client sends text as a GET query string. Non-Latin text is
+# several times longer once percent-encoded (one CJK character is 9 bytes),
+# so Google batches are also capped by their encoded size.
+GOOGLE_ENCODED_LIMIT = 6000
+
+# Delimiter placed on its own line between segments. The translator leaves
+# the pipes alone, and the split tolerates whitespace it adds around them.
+BATCH_DELIMITER = "\n|||\n"
+SPLIT_RE = re.compile(r"\s*\|\|\|\s*")
+
+
+def can_batch(text: str) -> bool:
+    """Segments containing the delimiter or line breaks are sent on their own"""
+    return "|||" not in text and "\n" not in text and "\r" not in text
+
+
+def encoded_length(text: str) -> int:
+    """Length of text once percent-encoded into a URL query string"""
+    return len(quote_plus(text.encode("utf-8")))
+
+
+def pack_batches(texts: list, max_chars: int = GOOGLE_CHAR_LIMIT, max_encoded: int = None) -> list:
+    """
+    Group segment indices into batches whose joined size fits in max_chars
+    (and, if given, whose percent-encoded size fits in max_encoded).
+    Order is preserved, so each batch is a run of increasing indices.
+    """
+    delimiter_encoded = encoded_length(BATCH_DELIMITER)
+    batches = []
+    current = []
+    size = encoded = 0
+    for i, text in enumerate(texts):
+        text_encoded = encoded_length(text) if max_encoded else 0
+        if not can_batch(text) or len(text) >= max_chars or \
+                (max_encoded and text_encoded >= max_encoded):
+            if current:
+                batches.append(current)
+                current, size, encoded = [], 0, 0
+            batches.append([i])
+            continue
+
+        extra = len(text) + (len(BATCH_DELIMITER) if current else 0)
+        extra_encoded = text_encoded + (delimiter_encoded if current else 0)
+        if current and (size + extra > max_chars or
+                        (max_encoded and encoded + extra_encoded > max_encoded)):
+            batches.append(current)
+            current, size, encoded = [], 0, 0
+            extra, extra_encoded = len(text), text_encoded
+        current.append(i)
+        size += extra
+        encoded += extra_encoded
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def split_batch(response: str, expected: int):
+    """Split a batched response back into segments, or None if it doesn't line up"""
+    if not response:
+        return None
+    parts = SPLIT_RE.split(response.strip())
+    if len(parts) != expected or not all(p.strip() for p in parts):
+        return None
+    return parts
+
+
+def _translate_single(text, translate_one):
+    try:
+        return translate_one(text)
+    except Exception as e:
+        print(f"⚠ Translation error: {e}")
+        return None
+
+
+def translate_batch(texts: list, translate_one) -> list:
+    """
+    Translate one packed batch with a single call to translate_one.
+    Falls back to per-segment calls when the request fails or the response
+    can't be split cleanly. Failed segments come back as None.
+    """
+    if len(texts) == 1:
+        return [_translate_single(texts[0], translate_one)]
+
+    try:
+        parts = split_batch(translate_one(BATCH_DELIMITER.join(texts)), len(texts))
+    except Exception as e:
+        print(f"⚠ Batch of {len(texts)} segments failed ({e}), retrying one by one")
+        parts = None
+    else:
+        if parts is None:
+            print(f"⚠ Batch of {len(texts)} segments did not split cleanly, retrying one by one")
+
+    if parts is None:
+        return [_translate_single(t, translate_one) for t in texts]
+    return parts
+
+
+def translate_batched(texts: list, translate_one, max_chars: int = GOOGLE_CHAR_LIMIT,
+                      on_progress=None, max_workers: int = DEFAULT_WORKERS,
+                      max_encoded: int = None) -> list:
+    """
+    Translate a list of segments using as few translator requests as possible.
+
+    `translate_one(text)` performs a single provider request and raises on
+    failure; up to max_workers batches are in flight at once. Results keep
+    the input order; failed segments are None. `on_progress(done, total)`
+    is called after every batch.
+    """
+    results = [None] * len(texts)
+    batches = pack_batches(texts, max_chars, max_encoded)
+    done = 0
+
+    def finished(index, translated):
+        nonlocal done
+        for i, out in zip(batches[index], translated):
+            results[i] = out
+        done += len(batches[index])
+        if on_progress:
+            on_progress(done, len(texts))
+
+    run_bounded(
+        batches,
+        lambda batch: translate_batch([texts[i] for i in batch], translate_one),
+        max_workers=max_workers,
+        on_done=finished,
+    )
+    return results
@@ -0,0 +1,123 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Callable, NamedTuple
+
+# Default number of translator requests allowed in flight at once
+DEFAULT_WORKERS = 8
+
+
+def run_bounded(tasks: list, worker, max_workers: int = DEFAULT_WORKERS, on_done=None) -> list:
+    """
+    Run worker(task) for every task with at most max_workers running at once.
+
+    Results are returned in input order regardless of completion order.
+    `on_done(index, result)` is called on the calling thread as each task
+    finishes, so callers can report progress without extra locking.
+    """
+    results = [None] * len(tasks)
+    if not tasks:
+        return results
+
+    if max_workers <= 1 or len(tasks) == 1:
+        for i, task in enumerate(tasks):
+            results[i] = worker(task)
+            if on_done:
+                on_done(i, results[i])
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        futures = {pool.submit(worker, task): i for i, task in enumerate(tasks)}
+        for future in as_completed(futures):
+            i = futures[future]
+            results[i] = future.result()
+            if on_done:
+                on_done(i, results[i])
+    return results
+
+
+class Stage(NamedTuple):
+    """One pipeline stage: fn(value) -> value for the next stage, or None to drop the item"""
+    name: str
+    fn: Callable
+    workers: int = 1
+
+
+_END = object()
+
+
+def run_pipeline(items: list, stages: list, queue_size: int = 8, on_done=None) -> list:
+    """
+    Push items through stages connected by bounded queues, each stage with
+    its own worker threads, so every stage is busy at once and a slow stage
+    holds back (rather than buffers) the ones before it.
+
+    Returns the last stage's results in input order; items a stage dropped
+    or failed on come back as None. `on_done(done, total)` is called as
+    each item leaves the pipeline, from whichever worker finished it.
+    """
+    results = [None] * len(items)
+    if not items:
+        return results
+
+    queues = [Queue(maxsize=queue_size) for _ in stages]
+    lock = threading.Lock()
+    finished = 0
+
+    def complete(index, value):
+        nonlocal finished
+        results[index] = value
+        with lock:
+            finished += 1
+            done = finished
+        if on_done:
+            on_done(done, len(items))
+
+    def work(k):
+        stage = stages[k]
+        while True:
+            job = queues[k].get()
+            if job is _END:
+                return
+            index, value = job
+            try:
+                out = stage.fn(value)
+            except Exception as e:
+                print(f"⚠ {stage.name} failed: {e}")
+                out = None
+            if out is not None and k + 1 < len(stages):
+                queues[k + 1].put((index, out))
+            else:
+                complete(index, out)
+
+    threads = [
+        [threading.Thread(target=work, args=(k,), daemon=True) for _ in range(max(stage.workers, 1))]
+        for k, stage in enumerate(stages)
+    ]
+    for stage_threads in threads:
+        for t in stage_threads:
+            t.start()
+
+    for index, item in enumerate(items):
+        queues[0].put((index, item))
+    # Close each stage once everything upstream of it has drained
+    for k, stage_threads in enumerate(threads):
+        for _ in stage_threads:
+            queues[k].put(_END)
+        for t in stage_threads:
+            t.join()
+    return results
+
+
+class Throughput:
+    """Tracks items completed per second since construction"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.count = 0
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.count / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,127 @@
+import sqlite3
+import time
+import unicodedata
+from pathlib import Path
+from threading import Lock
+
+
+def normalize_text(text: str) -> str:
+    """Normalize source text so trivially different strings share one entry"""
+    text = unicodedata.normalize("NFC", text or "")
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """
+    Disk-backed translation memory (SQLite) with LRU eviction.
+
+    Entries are keyed by normalized source text + source lang + target lang.
+    Safe to share between the Flask request threads and background workers.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 200_000):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._inserts_since_evict = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS memory (
+                source_text TEXT NOT NULL,
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (source_text, source_lang, target_lang)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS memory_last_used ON memory (last_used)"
+        )
+        self._conn.commit()
+
+    def get(self, text: str, source_lang: str, target_lang: str):
+        """Return the stored translation or None, refreshing its LRU position"""
+        key = normalize_text(text)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM memory "
+                "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                (key, source_lang, target_lang),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE memory SET last_used = ? "
+                "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                (time.time(), key, source_lang, target_lang),
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, text: str, source_lang: str, target_lang: str, translation: str):
+        """Store a translation, evicting least recently used entries when full"""
+        key = normalize_text(text)
+        if not key or translation is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO memory "
+                "(source_text, source_lang, target_lang, translation, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, source_lang, target_lang, translation, time.time()),
+            )
+            self._inserts_since_evict += 1
+            # Evicting on every insert would scan the index constantly; allow a
+            # small overshoot (1%) before trimming back to max_entries.
+            if self._inserts_since_evict >= max(self.max_entries // 100, 1):
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._inserts_since_evict = 0
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM memory WHERE rowid IN ("
+                "SELECT rowid FROM memory ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def find_cached(self, texts, source_lang: str, target_lang: str) -> set:
+        """The texts that already have a translation; read-only, no LRU refresh"""
+        found = set()
+        with self._lock:
+            for text in texts:
+                row = self._conn.execute(
+                    "SELECT 1 FROM memory "
+                    "WHERE source_text = ? AND source_lang = ? AND target_lang = ?",
+                    (normalize_text(text), source_lang, target_lang),
+                ).fetchone()
+                if row is not None:
+                    found.add(text)
+        return found
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current entry count"""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM memory").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": count,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Local HTTP translation stub for offline load testing.
+
+Answers POST /translate {"q", "source", "target"} with
+{"translatedText": "[target] ..."}, prefixing every line so batched
+requests still split cleanly. Optional latency and failure rate let you
+exercise the rate limiter and circuit breakers.
+
+    python translation_stub_server.py --port 5055 --latency 0.2 --fail-rate 0.05
+    TRANSLATION_BACKENDS=stub python app-v2.py
+"""
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_translate(text: str, target: str) -> str:
+    return "\n".join(
+        line if not line.strip() or line.strip() == "|||" else f"[{target}] {line}"
+        for line in text.split("\n")
+    )
+
+
+def make_handler(latency: float, fail_rate: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/translate":
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+
+            if latency:
+                time.sleep(latency)
+            if random.random() < fail_rate:
+                self.send_error(random.choice((429, 503)))
+                return
+
+            body = json.dumps({
+                "translatedText": fake_translate(payload.get("q", ""), payload.get("target", "en"))
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def run_stub_server(host: str = "127.0.0.1", port: int = 5055,
+                    latency: float = 0.0, fail_rate: float = 0.0):
+    server = ThreadingHTTPServer((host, port), make_handler(latency, fail_rate))
+    print(f"🧪 Translation stub listening on http://{host}:{port}/translate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction answered 429/503")
+    args = parser.parse_args()
+    run_stub_server(args.host, args.port, args.latency, args.fail_rate)
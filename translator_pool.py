@@ -0,0 +1,86 @@
+from threading import Lock
+
+import requests
+from bs4 import BeautifulSoup
+from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+from deep_translator.validate import is_empty, is_input_valid, request_failed
+from requests.adapters import HTTPAdapter
+
+REQUEST_TIMEOUT = 15
+
+
+class ServerError(RequestError):
+    """The provider answered 5xx: overloaded or down, not a problem with the text"""
+
+
+def make_session(pool_size: int = 16) -> requests.Session:
+    """requests.Session whose connection pool can serve pool_size threads"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class SessionGoogleTranslator(GoogleTranslator):
+    """
+    GoogleTranslator that reuses a shared keep-alive session.
+
+    The stock translate() goes through requests.get (a new connection per
+    call) and mutates self._url_params, so one instance can't be shared
+    between threads. This version builds its query per call instead.
+    """
+
+    def __init__(self, source: str, target: str, session: requests.Session, **kwargs):
+        super().__init__(source=source, target=target, **kwargs)
+        self.session = session
+
+    def translate(self, text: str, **kwargs) -> str:
+        is_input_valid(text, max_chars=5000)
+        text = text.strip()
+        if self._same_source_target() or is_empty(text):
+            return text
+
+        params = dict(self._url_params, tl=self._target, sl=self._source)
+        params[self.payload_key] = text
+        response = self.session.get(
+            self._base_url, params=params, proxies=self.proxies, timeout=REQUEST_TIMEOUT
+        )
+        try:
+            if response.status_code == 429:
+                raise TooManyRequests()
+            if response.status_code >= 500:
+                raise ServerError()
+            if request_failed(status_code=response.status_code):
+                raise RequestError()
+            soup = BeautifulSoup(response.text, "html.parser")
+        finally:
+            response.close()
+
+        element = soup.find(self._element_tag, self._element_query)
+        if not element:
+            element = soup.find(self._element_tag, self._alt_element_query)
+            if not element:
+                raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+
+class TranslatorPool:
+    """Long-lived translator clients keyed by (source, target), safe across threads"""
+
+    def __init__(self, pool_size: int = 16):
+        self.session = make_session(pool_size)
+        self._clients = {}
+        self._lock = Lock()
+
+    def get(self, source: str, target: str) -> SessionGoogleTranslator:
+        key = (source, target)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = SessionGoogleTranslator(source, target, self.session)
+                    self._clients[key] = client
+        return client
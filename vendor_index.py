@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+from threading import Lock
+
+
+class VendorIndex:
+    """
+    Content-hash index of third-party and player runtime files (jQuery,
+    MathJax, Storyline/Rise runtimes) that never hold course text.
+
+    Hashes come from an optional config file ({"<sha256>": "description"})
+    and are learned from past courses: a file seen byte-for-byte in
+    min_courses distinct courses (all versions of a course count once)
+    without a single translatable segment is runtime, not content.
+    Matching files are classified "vendor" in the course inventory so they
+    are never read or scanned.
+    """
+
+    def __init__(self, index_path: Path, config_path: Path = None, min_courses: int = 3):
+        self.index_path = Path(index_path)
+        self.min_courses = min_courses
+        self._lock = Lock()
+        self.known = self._load(config_path) if config_path else {}
+        # hash -> list of course ids (lineage roots) it was seen in
+        self.seen = self._load(self.index_path)
+
+    @staticmethod
+    def _load(path: Path) -> dict:
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def is_vendor(self, digest: str) -> bool:
+        if digest in self.known:
+            return True
+        with self._lock:
+            return len(self.seen.get(digest, ())) >= self.min_courses
+
+    def mark(self, inventory: dict):
+        """Reclassify known text files as vendor; returns (files, bytes) newly skipped"""
+        count = size = 0
+        for entry in inventory["files"]:
+            if entry["class"] == "text" and self.is_vendor(entry["hash"]):
+                entry["class"] = "vendor"
+                count += 1
+                size += entry["size"]
+        return count, size
+
+    def learn(self, course: str, digests):
+        """Record that course shipped files with these hashes"""
+        with self._lock:
+            for digest in set(digests):
+                courses = self.seen.setdefault(digest, [])
+                if course not in courses:
+                    courses.append(course)
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(".tmp")
+            with open(tmp, "w") as f:
+                json.dump(self.seen, f)
+            tmp.replace(self.index_path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            learned = sum(1 for c in self.seen.values() if len(c) >= self.min_courses)
+            return {
+                "configured": len(self.known),
+                "learned": learned,
+                "candidates": len(self.seen) - learned,
+                "min_courses": self.min_courses,
+            }